@@ -5,6 +5,7 @@ import sys
 parameters = []
 if __name__ == "__main__":
     instance = int(sys.argv[1])
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 1
 
     # Instance
     if not os.path.exists("./data/diagnostics/instance" + str(instance)):
@@ -12,7 +13,7 @@ if __name__ == "__main__":
 
     # Instantiate genetic algorithm
     algorithm = GeneticAlgorithm(save_generations=False, population_size=100,
-                                 fittest_size=.33, random_size=.33, children_size=.33, penalty=100000, initial_random_factor=5, iterations=100, log_to_console=True)
+                                 fittest_size=.33, random_size=.33, children_size=.33, penalty=100000, initial_random_factor=5, iterations=100, log_to_console=True, workers=workers)
 
     # Run instance
     print("\r\n\r\nRunning instance", instance)
@@ -0,0 +1,26 @@
+from functions.batch import run_batch, parse_instances, default_settings
+import argparse
+
+if __name__ == "__main__":
+    # Arguments
+    parser = argparse.ArgumentParser(description="Run many instances on a pool of worker processes")
+    parser.add_argument("--instances", help="instances to run, e.g. 1-450 or 1,5,10-20, all instances by default")
+    parser.add_argument("--unsolved", action="store_true", help="only run instances without a feasible solution")
+    parser.add_argument("--workers", type=int, default=1, help="number of worker processes")
+    parser.add_argument("--iterations", type=int, default=100, help="iterations per set of the genetic algorithm")
+    parser.add_argument("--summary", default="data/batch_summary.csv", help="path of the summary CSV")
+    parser.add_argument("--exact-threshold", type=int, default=0,
+                        help="search instances with at most this number of picking areas exhaustively, off by default "
+                             "as the search proves optimality in time only up to 4 or 5 picking areas (5 picking areas "
+                             "of instance 1 in 14 s, not those of instance 2 in 60 s) and instances have at least 10")
+    parser.add_argument("--exact-run-time", type=float, default=30,
+                        help="seconds of the exhaustive search before falling back to the genetic algorithm")
+    args = parser.parse_args()
+
+    # Solver settings with the given iterations
+    settings = dict(default_settings, iterations=args.iterations)
+
+    # Run batch
+    instances = parse_instances(args.instances) if args.instances is not None else None
+    run_batch(instances=instances, unsolved=args.unsolved, workers=args.workers, settings=settings, summary=args.summary,
+              exact_threshold=args.exact_threshold, exact_run_time=args.exact_run_time)
@@ -0,0 +1,44 @@
+# Benchmark of processing chromosomes that differ in the aisles or cross-aisles of one picking area, from an empty
+# warehouse against incrementally from the placement of the parent
+# Run from the repository root: python -m benchmarks.incremental
+from classes import GeneticAlgorithm
+from functions import read_instance
+from random import randrange
+from timeit import timeit
+import numpy as np
+
+
+if __name__ == "__main__":
+    # First instance of every number of picking areas
+    instances = {}
+    for instance in range(1, 451):
+        instances.setdefault(read_instance(instance)[2], instance)
+
+    for N, instance in sorted(instances.items()):
+        np.random.seed(0)
+        algorithm = GeneticAlgorithm(log_to_console=False)
+        algorithm.instantiate(instance)
+        warehouse = algorithm.warehouse
+
+        # Parent and children with one more aisle or cross-aisle for a random picking area, as mutate_001 and mutate_002
+        parent = algorithm.create_random_chromosome()
+        children = []
+        for i in range(50):
+            child = list(parent)
+            child[randrange(N, 3 * N)] += 1
+            children.append(child)
+
+        # Placement of the parent
+        warehouse.process(parent)
+        placement = warehouse.placement
+
+        # Both must give the same objective values
+        full = [warehouse.process(child) for child in children]
+        incremental = [warehouse.process(child, placement=placement) for child in children]
+        assert full == incremental
+
+        full = timeit(lambda: [warehouse.process(child) for child in children], number=3) / 3 / len(children)
+        incremental = timeit(lambda: [warehouse.process(child, placement=placement) for child in children],
+                             number=3) / 3 / len(children)
+        print("N =", str(N).rjust(2), "full:", str(round(full * 1e3, 2)).rjust(5), "ms", "incremental:",
+              str(round(incremental * 1e3, 2)).rjust(5), "ms per child")
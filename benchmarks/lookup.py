@@ -0,0 +1,66 @@
+# Micro-benchmark of lookup_travel_distance against the original pandas MultiIndex lookups
+# Run from the repository root: python -m benchmarks.lookup
+from functions import lookup_travel_distance, read_instance
+from timeit import timeit
+import pandas as pd
+import pathlib
+import numpy as np
+import math
+
+# Directory path
+directory = str(pathlib.Path().resolve())
+
+# Pandas lookup tables
+df_g = pd.read_csv(directory + "/data/processed_lookup_g.csv", index_col=[0, 1, 2])
+df_h = pd.read_csv(directory + "/data/processed_lookup_h.csv", index_col=[0, 1, 2])
+df_f = pd.read_csv(directory + "/data/processed_lookup_f.csv", index_col=[0, 1, 2])
+
+
+def lookup_travel_distance_pandas(n, k, m, S=1, w=.2, v=.1):
+    # Failsafes
+    if n < 1 or n > 30 or k < 2 or k > 10:
+        return math.inf
+
+    if isinstance(m, list):
+        # Calculate average travel distance based on distribution of order sizes
+        order_sizes = np.arange(1, len(m) + 1)
+        m = np.array(m)
+
+        # Calculate expected travel distance
+        expected_travel_distance = 0
+        i = 0
+        for size in order_sizes:
+            g = df_g.loc[(n, k, size)]["distance"]
+            h = df_h.loc[(n, k, size)]["distance"]
+            f = df_f.loc[(n, k, size)]["distance"]
+            T_im = S * (g / n) + w * h + v * f
+            expected_travel_distance = expected_travel_distance + m[i] * T_im
+            i = i + 1
+
+        # Return expected travel distance
+        return round(expected_travel_distance, 2)
+    else:
+        g = df_g.loc[(n, k, m)]["distance"]
+        h = df_h.loc[(n, k, m)]["distance"]
+        f = df_f.loc[(n, k, m)]["distance"]
+        T_i1 = S * (g / n) + w * h + v * f
+        return round(T_i1, 2)
+
+
+if __name__ == "__main__":
+    # Use the first picking area of the first instance
+    W, H, N, w_i, v_i, S, alpha, u, mean_u = read_instance(1)
+    options = [(n, k) for n in range(1, 31, 3) for k in range(2, 11, 2)]
+
+    # Check that both paths agree
+    for n, k in options:
+        assert lookup_travel_distance(n, k, u[0], S[0], w_i, v_i) == lookup_travel_distance_pandas(n, k, u[0], S[0], w_i, v_i)
+        assert lookup_travel_distance(n, k, 1, S[0], w_i, v_i) == lookup_travel_distance_pandas(n, k, 1, S[0], w_i, v_i)
+
+    # Time both paths
+    for name, function in [("pandas", lookup_travel_distance_pandas), ("numpy", lookup_travel_distance)]:
+        distribution = timeit(lambda: [function(n, k, u[0], S[0], w_i, v_i) for n, k in options], number=3)
+        single = timeit(lambda: [function(n, k, 1, S[0], w_i, v_i) for n, k in options], number=3)
+        calls = 3 * len(options)
+        print(name.ljust(8), "distribution:", round(distribution / calls * 1e6, 1), "us/call,",
+              "single order size:", round(single / calls * 1e6, 1), "us/call")
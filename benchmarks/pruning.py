@@ -0,0 +1,43 @@
+# Benchmark of the elimination of contained EMSs in Warehouse.update_ems_list, the original pairwise check against the sweep
+# Run from the repository root: python -m benchmarks.pruning
+from classes import EmptyMaximalSpace, Warehouse
+from timeit import timeit
+import numpy as np
+
+
+def remove_contained_ems_pairwise(EMS_list):
+    # Original pairwise elimination
+    reduced_EMS_list = []
+    for child_index, EMS_child in enumerate(EMS_list):
+        child_fits = False
+        for parent_index, EMS_parent in enumerate(EMS_list):
+            if not child_fits and child_index != parent_index:
+                child_fits = EMS_parent.contains_ems(EMS_child)
+
+        if not child_fits:
+            reduced_EMS_list.append(EMS_child)
+
+    # Return
+    return reduced_EMS_list
+
+
+def random_ems_list(size, grid):
+    # EMSs on a coarse grid, such that equal EMSs and EMSs touching on borders are common
+    coordinates = np.random.randint(0, grid, (size, 2))
+    dimensions = np.random.randint(0, grid // 2, (size, 2))
+    return [EmptyMaximalSpace(float(x), float(y), float(w), float(h))
+            for (x, y), (w, h) in zip(coordinates, dimensions)]
+
+
+if __name__ == "__main__":
+    # Both eliminations keep the same EMSs, see tests/test_pruning.py
+    warehouse = Warehouse(100, 100, [], [], 1)
+
+    # Time both eliminations
+    for size in [16, 64, 256, 1024]:
+        np.random.seed(0)
+        EMS_lists = [random_ems_list(size, 100) for x in range(5)]
+        pairwise = timeit(lambda: [remove_contained_ems_pairwise(x) for x in EMS_lists], number=1) / 5
+        sweep = timeit(lambda: [warehouse.remove_contained_ems(x) for x in EMS_lists], number=1) / 5
+        print("EMSs:", str(size).rjust(4), "pairwise:", str(round(pairwise * 1e3, 2)).rjust(8), "ms",
+              "sweep:", str(round(sweep * 1e3, 2)).rjust(6), "ms")
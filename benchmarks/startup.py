@@ -0,0 +1,24 @@
+# Benchmark of the startup time of python __main__.py <instance>, the time until the genetic algorithm is imported, and
+# whether the plotting and animation dependencies are loaded by then
+# Run from the repository root: python -m benchmarks.startup
+from timeit import repeat
+import subprocess
+import sys
+
+# Imports of __main__.py, followed by a report of the loaded plotting and animation modules
+script = "from classes import GeneticAlgorithm\n" \
+         "import sys\n" \
+         "print(' '.join(x for x in ['matplotlib', 'imageio', 'PIL'] if x in sys.modules))"
+
+
+if __name__ == "__main__":
+    # Loaded modules
+    loaded = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True).stdout.strip()
+    print("Loaded at startup:", loaded if loaded else "none")
+
+    # Best of ten fresh interpreters, including the interpreter startup
+    times = repeat(lambda: subprocess.run([sys.executable, "-c", script], capture_output=True, check=True), number=1,
+                   repeat=10)
+    interpreter = repeat(lambda: subprocess.run([sys.executable, "-c", "pass"], check=True), number=1, repeat=10)
+    print("Startup:", str(round(min(times) * 1e3)), "ms, of which", str(round(min(interpreter) * 1e3)),
+          "ms interpreter")
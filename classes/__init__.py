@@ -1,5 +1,6 @@
 # __init__.py
-from .warehouse import Warehouse
+from .warehouse import Warehouse, DOMINATED
 from .picking_area import PickingArea
 from .empty_maximal_space import EmptyMaximalSpace
 from .genetic_algorithm import GeneticAlgorithm
+from .branch_and_bound import BranchAndBound
@@ -0,0 +1,93 @@
+from functions import write_instance
+import threading
+import atexit
+import queue
+import time
+import csv
+import os
+
+
+def append_rows(path, columns, rows):
+    # Append rows to a CSV file, writing the header if the file is new
+    exists = os.path.exists(path)
+    with open(path, "a", newline='') as f:
+        writer = csv.writer(f)
+        if not exists:
+            writer.writerow(columns)
+        writer.writerows(rows)
+
+
+class BackgroundWriter:
+    def __init__(self, interval=5, maxsize=1000):
+        # Writes are queued and written by a thread every interval seconds, the latest solution per instance only
+        self.queue = queue.Queue(maxsize)
+        self.interval = interval
+        self.closed = False
+
+        # Start thread, pending writes are flushed on exit
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    def write_solution(self, instance, obj_value, coordinates):
+        # Queue solution, replaces earlier solutions of the instance that were not written yet
+        self.queue.put(("solution", instance, (obj_value, coordinates)))
+
+    def append_row(self, path, columns, row):
+        # Queue row to append to a CSV file
+        self.queue.put(("row", path, (columns, row)))
+
+    def flush(self):
+        # Write everything that is queued and wait until it is written
+        done = threading.Event()
+        self.queue.put(("flush", None, done))
+        done.wait()
+
+    def close(self):
+        # Write everything that is queued and stop the thread
+        if not self.closed:
+            self.closed = True
+            self.queue.put(("close", None, None))
+            self.thread.join()
+
+    def run(self):
+        # Pending solutions by instance and pending rows by path
+        solutions = {}
+        rows = {}
+        last_write = time.time()
+
+        while True:
+            # Wait for the next item, at most until the next write
+            try:
+                kind, key, value = self.queue.get(timeout=max(0, last_write + self.interval - time.time()))
+            except queue.Empty:
+                kind, key, value = "timeout", None, None
+
+            # Coalesce
+            if kind == "solution":
+                solutions[key] = value
+            elif kind == "row":
+                rows.setdefault(key, (value[0], []))[1].append(value[1])
+
+            # Write if requested or if the interval has passed
+            if kind in ["flush", "close"] or time.time() - last_write >= self.interval:
+                self.write(solutions, rows)
+                solutions, rows = {}, {}
+                last_write = time.time()
+
+            # Notify or stop
+            if kind == "flush":
+                value.set()
+            elif kind == "close":
+                return
+
+    def write(self, solutions, rows):
+        # A failing write must not stop the thread, as the queue would fill up
+        try:
+            for instance, (obj_value, coordinates) in solutions.items():
+                write_instance(instance, obj_value, coordinates)
+
+            for path, (columns, path_rows) in rows.items():
+                append_rows(path, columns, path_rows)
+        except Exception as e:
+            print("Could not write:", e)
@@ -0,0 +1,189 @@
+import math
+import numpy as np
+from datetime import datetime
+from classes import Warehouse
+from functions import read_instance, write_instance, create_travel_distance_table
+
+# Objective values within this margin are considered equal, bounds add the rounded distances in another order than
+# placements
+EPSILON = 1e-6
+
+
+class BranchAndBound:
+    def __init__(self, penalty=100000, max_run_time=60, log_to_console=True):
+        # Instantiate warehouse
+        self.warehouse = None
+        self.penalty = penalty
+        self.instance = 0
+        self.N = None
+
+        # Settings, the search stops after max_run_time seconds with the best solution found
+        self.max_run_time = max_run_time
+        self.log_to_console = log_to_console
+
+        # Search state
+        self.start_time = None
+        self.fittest_obj_value = math.inf
+        self.fittest_chromosome = None
+        self.optimal = False
+        self.nodes = 0
+        self.dominated_states = {}
+
+    def instantiate(self, instance):
+        # Read variables from instance
+        W, H, N, w_i, v_i, S, alpha, u, mean_u = read_instance(instance)
+
+        # Instantiate warehouse without EMS history, as placements are undone by restoring placement states
+        self.warehouse = Warehouse(W, H, S, u, alpha, animate=False, w_i=w_i, v_i=v_i, penalty=self.penalty,
+                                   save_history=False)
+
+        # Precompute the travel distances of every picking area for all numbers of aisles and cross-aisles
+        self.warehouse.travel_distances = create_travel_distance_table(S, u, alpha, w_i, v_i)
+        self.N = N
+
+    def create_options(self):
+        # All numbers of aisles and cross-aisles of the lookup table
+        n, k = np.meshgrid(np.arange(1, 31), np.arange(2, 11), indexing="ij")
+        n, k = n.ravel(), k.ravel()
+
+        # Sizes and Ri + Ti of every option of every picking area, calculated as in PickingArea
+        self.options = []
+        for index in range(self.N):
+            widths = self.warehouse.w_i * n.astype(float)
+            heights = self.warehouse.storage_capacities[index] / n.astype(float) + self.warehouse.v_i * k
+            travel_distances = self.warehouse.travel_distances[index, n - 1, k - 2].sum(axis=-1)
+
+            # Keep options that fit in the warehouse
+            fits = (widths <= self.warehouse.W) & (heights <= self.warehouse.H)
+            self.options.append((n[fits], k[fits], widths[fits], heights[fits], travel_distances[fits]))
+
+    def get_placement_costs(self, index):
+        # Lowest EMS in which every option of the picking area fits, EMSs only shrink as picking areas are placed
+        n, k, widths, heights, travel_distances = self.options[index]
+        fits = (widths[:, None] <= np.array([EMS.w for EMS in self.warehouse.EMS_list])) & \
+               (heights[:, None] <= np.array([EMS.h for EMS in self.warehouse.EMS_list]))
+
+        # Ui of every EMS, rounded as in PickingArea since np.round rounds some halves differently than round
+        alpha = self.warehouse.replenishments[index]
+        Ui = np.array([round(2 * EMS.y * (1 + alpha), 2) for EMS in self.warehouse.EMS_list])
+
+        # Travel distance of every option if it is placed now and a lower bound if it is placed later, options that
+        # fit in no EMS cost infinitely much, as they can only be placed infeasibly
+        return np.where(fits, Ui, np.inf).min(axis=1, initial=np.inf) + travel_distances
+
+    def run(self, instance):
+        # Instantiate
+        self.instance = instance
+        self.instantiate(instance)
+        if self.log_to_console:
+            print("Instance instantiated")
+
+        # Search
+        solution = self.solve()
+
+        # Log
+        if self.log_to_console:
+            if solution is None:
+                print("\r\nBranch and bound did not find a feasible solution")
+            else:
+                print("\r\n" + ("Optimal" if self.optimal else "Best") + " chromosome:", solution[0])
+                print("Total distance:", solution[1])
+                print("Nodes:", self.nodes)
+
+        # Write output
+        if solution is not None:
+            self.write_solution(solution[0])
+
+        # Return solution
+        return solution
+
+    def write_solution(self, chromosome):
+        # Place the chromosome and write its layout
+        self.warehouse.process(chromosome)
+        write_instance(self.instance, self.warehouse.total_travel_distance if self.warehouse.feasible else -1,
+                       self.warehouse.get_PA_dimensions(ordered=True))
+
+    def solve(self):
+        # Options of every picking area
+        self.create_options()
+
+        # Search from an empty warehouse
+        self.start_time = datetime.now()
+        self.fittest_obj_value = math.inf
+        self.fittest_chromosome = None
+        self.nodes = 0
+        self.dominated_states = {}
+        self.warehouse.reset()
+        self.optimal = self.branch([], np.zeros(self.N), np.zeros(self.N))
+
+        # Return chromosome, objective value and feasibility of the fittest feasible solution
+        if self.fittest_chromosome is None:
+            return None
+
+        return self.fittest_chromosome, self.fittest_obj_value, True
+
+    def branch(self, order, aisles, cross_aisles):
+        # Stop if the search takes too long, the solution is then not proven to be optimal
+        self.nodes = self.nodes + 1
+        if (datetime.now() - self.start_time).total_seconds() > self.max_run_time:
+            return False
+
+        # All picking areas are placed
+        total = self.warehouse.total_travel_distance
+        if len(order) == self.N:
+            if total < self.fittest_obj_value - EPSILON:
+                # Order keys such that np.argsort returns the order, unrounded as rounded keys collide for N > 100
+                keys = np.zeros(self.N)
+                keys[order] = np.arange(self.N) / self.N
+                self.fittest_chromosome = [*keys.tolist(), *aisles.tolist(), *cross_aisles.tolist()]
+                self.fittest_obj_value = round(total, 2)
+
+                # Log
+                if self.log_to_console:
+                    print("Found solution with objective value", self.fittest_obj_value)
+
+            return True
+
+        # Placement costs of every option of every remaining picking area and their lower bounds
+        remaining = [index for index in range(self.N) if index not in order]
+        costs = {index: self.get_placement_costs(index) for index in remaining}
+        lower_bounds = {index: costs[index].min() if len(costs[index]) > 0 else np.inf for index in remaining}
+        lower_bound = sum(lower_bounds.values())
+
+        # A remaining picking area fits in no EMS, so no feasible solution follows
+        if math.isinf(lower_bound):
+            return True
+
+        # Branches by lower bound, every remaining picking area can be placed next with every option that fits
+        branches = []
+        for index in remaining:
+            bounds = total + lower_bound - lower_bounds[index] + costs[index]
+            for option in np.flatnonzero(bounds < self.fittest_obj_value - EPSILON):
+                branches.append((bounds[option], index, option))
+        branches.sort()
+
+        completed = True
+        for bound, index, option in branches:
+            # The fittest objective value may have improved in an earlier branch
+            if bound >= self.fittest_obj_value - EPSILON:
+                break
+
+            # Place picking area
+            aisles[index], cross_aisles[index] = self.options[index][0][option], self.options[index][1][option]
+            self.warehouse.place([index], aisles, cross_aisles)
+
+            # Skip if the same picking areas were placed with the same EMSs at a lower or equal travel distance
+            key = (frozenset(order + [index]), tuple((EMS.x, EMS.y, EMS.w, EMS.h) for EMS in self.warehouse.EMS_list))
+            if self.dominated_states.get(key, math.inf) > self.warehouse.total_travel_distance + EPSILON:
+                self.dominated_states[key] = self.warehouse.total_travel_distance
+                completed = self.branch(order + [index], aisles, cross_aisles) and completed
+
+            # Undo placement
+            self.warehouse.restore_position(len(order))
+
+            # Stop if the search takes too long
+            if not completed and (datetime.now() - self.start_time).total_seconds() > self.max_run_time:
+                return False
+
+        # Return whether the search of this branch was completed
+        return completed
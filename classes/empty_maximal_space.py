@@ -34,6 +34,16 @@ class EmptyMaximalSpace:
         # Check if EMS contains point
         return self.left_border < x < self.right_border and self.bottom_border < y < self.top_border
 
+    def contains_ems(self, EMS):
+        # Check if the other EMS fits within this EMS, borders included
+        left_fits = self.left_border <= EMS.left_border <= self.right_border
+        right_fits = self.left_border <= EMS.right_border <= self.right_border
+        bottom_fits = self.bottom_border <= EMS.bottom_border <= self.top_border
+        top_fits = self.bottom_border <= EMS.top_border <= self.top_border
+
+        # Return
+        return left_fits and right_fits and bottom_fits and top_fits
+
     def get_contained_corners(self, corners):
         # Check which points are contained in the EMS
         contained_corners = []
@@ -0,0 +1,76 @@
+import numpy as np
+
+# Columns of every child besides its chromosomes
+fields = ["generation", "child_no", "mutation_name", "obj_value", "feasibility"]
+
+# Chromosomes of every child, each stored in one column per gene
+chromosomes = ["mother", "father", "child", "mutation"]
+
+
+class GenerationLog:
+    def __init__(self, path, N, chunk_size=1000):
+        # Children are collected in a preallocated chunk that is appended to the CSV file once it is full
+        self.path = path
+        self.N = N
+        self.columns = fields + [name + "_" + str(gene) for name in chromosomes for gene in range(3 * N)]
+        self.chunk = np.zeros((chunk_size, len(self.columns)))
+        self.rows = 0
+
+        # Start file with header
+        with open(self.path, "w") as f:
+            f.write(",".join(self.columns) + "\n")
+
+    def append(self, generation, child_no, mutation_name, obj_value, feasibility, mother, father, child, mutation):
+        # Add child to chunk, mutation names are numbers such as 001
+        self.chunk[self.rows, :len(fields)] = [generation, child_no, int(mutation_name), obj_value, feasibility]
+        self.chunk[self.rows, len(fields):] = np.concatenate([mother, father, child, mutation])
+        self.rows = self.rows + 1
+
+        # Write full chunk
+        if self.rows == len(self.chunk):
+            self.flush()
+
+    def flush(self):
+        # Append collected children to the file
+        with open(self.path, "a") as f:
+            np.savetxt(f, self.chunk[:self.rows], delimiter=",", fmt="%.12g")
+
+        # Empty chunk
+        self.rows = 0
+
+
+def read_generation_log(path):
+    # Read header
+    with open(path) as f:
+        columns = f.readline().strip().split(",")
+
+    # Files written before the generation log hold chromosomes as strings such as 0.1|0.2|3|2
+    if "mother" in columns:
+        return read_legacy_generation_log(path)
+
+    # Columns as arrays and chromosomes as matrices with one chromosome per row
+    data = np.loadtxt(path, delimiter=",", skiprows=1, ndmin=2)
+    log = {field: data[:, columns.index(field)] for field in fields}
+    N = round((len(columns) - len(fields)) / len(chromosomes) / 3)
+    for name in chromosomes:
+        log[name] = data[:, [columns.index(name + "_" + str(gene)) for gene in range(3 * N)]]
+
+    # Mutation names as in the genetic algorithm
+    log["mutation_name"] = np.array([str(int(x)).zfill(3) for x in log["mutation_name"]])
+
+    # Return
+    return log
+
+
+def read_legacy_generation_log(path):
+    # Import here, pandas is only required for files written before the generation log
+    import pandas as pd
+    df = pd.read_csv(path)
+
+    # Columns as arrays and chromosomes as matrices with one chromosome per row
+    log = {field: df[field].to_numpy() if field in df else np.full(len(df.index), np.nan) for field in fields}
+    for name in chromosomes:
+        log[name] = np.array([[float(x) for x in str(row).split("|")] for row in df[name]], dtype=float)
+
+    # Return
+    return log
@@ -1,38 +1,99 @@
 import math
-from random import random, randrange, sample
+import heapq
+from random import randrange, sample, seed
 import numpy as np
 from classes import Warehouse
-from functions import read_instance, write_instance
+from classes.background_writer import BackgroundWriter, append_rows
+from classes.generation_log import GenerationLog
+from functions import read_instance, write_instance, create_travel_distance_table
 import pandas as pd
-from mutations import mutations
+from mutations import mutations, batch_mutations
 from datetime import datetime
 from generate_feasible_solutions import generate_feasible_solutions
 # from matplotlib import pyplot as plt
+import multiprocessing
+import collections
 import os
 
+# Warehouse of a worker process, created once by init_worker
+worker_warehouse = None
 
-def get_chromosomes(tup):
-    return tup[0]
 
+def init_worker(W, H, S, u, alpha, w_i, v_i, penalty, travel_distances):
+    global worker_warehouse
 
-def get_chromosomes_as_string(tup):
-    return "-".join(str(x) for x in tup[0])
+    # Instantiate warehouse of this worker
+    worker_warehouse = Warehouse(W, H, S, u, alpha, animate=False, w_i=w_i, v_i=v_i, penalty=penalty)
+    worker_warehouse.travel_distances = travel_distances
+
+
+def process_batch(chromosomes):
+    # Process chromosomes on the warehouse of this worker
+    return worker_warehouse.process_many(chromosomes)
+
+
+def run_island(connection, instance, settings, island, island_seed, migration_interval, migration_size):
+    # Every island searches with its own random numbers
+    seed(island_seed)
+    np.random.seed(island_seed)
+
+    # Island population, with its own mutation probabilities
+    algorithm = GeneticAlgorithm(**settings)
+    algorithm.instance = instance
+    algorithm.island = island
+    algorithm.instantiate(instance)
+    algorithm.create_initial_population(min_feasible=int(algorithm.fittest_size * algorithm.population_size))
+
+    while True:
+        # Evolve until the next migration
+        for i in range(migration_interval):
+            algorithm.create_next_population()
+
+        # Send fittest chromosomes and receive those of the previous island, None stops the island
+        connection.send(algorithm.select_fittest(migration_size))
+        migrants = connection.recv()
+        if migrants is None:
+            break
+
+        algorithm.add_migrants(migrants)
+
+    # Send final solution
+    connection.send(algorithm.select_fittest(1)[0])
+    connection.close()
+
+
+def get_chromosome_key(chromosome, N):
+    # Canonical form of a chromosome as used by Warehouse.process, the order of the picking areas and their aisles
+    # and cross-aisles, such that chromosomes with different order keys but equal layouts share a key
+    order = np.argsort(chromosome[:N])
+    return tuple(order.tolist()), tuple(float(x) for x in chromosome[N:3 * N])
 
 
 class GeneticAlgorithm:
-    def __init__(self, population_size=50, iterations=30, fittest_size=.2, random_size=.2, children_size=.5, penalty=10, initial_random_factor=5, save_generations=True, log_to_console=True):
+    def __init__(self, population_size=50, iterations=30, fittest_size=.2, random_size=.2, children_size=.5, penalty=10, initial_random_factor=5, save_generations=True, log_to_console=True, workers=1, cache_size=10000, precheck=False, renderer="matplotlib", steady_state=False, steady_state_size=.1, animate_solution=True):
         # Instantiate warehouse
         self.warehouse = None
         self.penalty = penalty
         self.instance = 0
         self.iteration = 0
 
+        # Drawing the warehouse with matplotlib, or with the headless "raster" renderer
+        self.renderer = renderer
+
+        # Animate the placement of the final solution, the frames are saved to the same files by every run
+        self.animate_solution = animate_solution
+
         # Instantiate variables
         self.N = None
         self.n_min, self.k_min, self.n_max, self.k_max = None, None, None, None
 
-        # Instantiate population
-        self.population = []
+        # Instantiate population as a matrix with one chromosome per row, the objective value and feasibility of every
+        # row, the number of rows in use and the number of members of every chromosome key
+        self.population = np.zeros((0, 0))
+        self.obj_values = np.zeros(0)
+        self.feasibilities = np.zeros(0, dtype=bool)
+        self.population_count = 0
+        self.population_keys = collections.Counter()
         self.population_size = population_size
 
         # Set parameters
@@ -45,10 +106,37 @@ class GeneticAlgorithm:
         self.fittest_obj_value = math.inf
         self.obj_value_decrease = 0
 
+        # Replace the worst members by a fraction of the population of children every generation instead of
+        # creating a new population, the worst members are kept in a heap of (feasibility, -objective value, index)
+        self.steady_state = steady_state
+        self.steady_state_size = steady_state_size
+        self.worst_heap = None
+
         # Save generations
         self.save_generations = save_generations
         self.generation_number = 0
-        self.generations = pd.DataFrame(columns=["generation", "mother", "father", "child"])
+        self.generations = None
+
+        # Worker processes to evaluate chromosomes in parallel, a single worker evaluates in this process
+        self.workers = workers
+        self.pool = None
+
+        # Least recently used objective values and feasibilities by chromosome key
+        self.cache_size = cache_size
+        self.fitness_cache = collections.OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+        # Reject chromosomes that are certainly infeasible before placing them, see Warehouse.precheck_many
+        self.precheck = precheck
+        self.precheck_rejections = 0
+
+        # Writer of solutions and diagnostics during a run, the chromosome key of the last written solution
+        self.writer = None
+        self.written_solution_key = None
+
+        # Number of the island in an island model, every island saves its mutation probabilities to its own file
+        self.island = None
 
         # Settings
         self.enable_diagnostics = True
@@ -66,12 +154,43 @@ class GeneticAlgorithm:
         W, H, N, w_i, v_i, S, alpha, u, mean_u = read_instance(instance)
 
         # Instantiate warehouse
-        self.warehouse = Warehouse(W, H, S, u, alpha, animate=False, w_i=w_i, v_i=v_i, penalty=self.penalty)
+        self.warehouse = Warehouse(W, H, S, u, alpha, animate=False, w_i=w_i, v_i=v_i, penalty=self.penalty,
+                                   renderer=self.renderer)
+
+        # Precompute the travel distances of every picking area for all numbers of aisles and cross-aisles
+        self.warehouse.travel_distances = create_travel_distance_table(S, u, alpha, w_i, v_i)
 
         # Instantiate variables
         self.N = N
+        self.fitness_cache = collections.OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.precheck_rejections = 0
         self.n_min, self.k_min, self.n_max, self.k_max = self.warehouse.n_min, self.warehouse.k_min, self.warehouse.n_max, self.warehouse.k_max
 
+        # Empty population, unless it holds chromosomes of this instance from an earlier run
+        if self.population.shape[1] != 3 * N:
+            self.clear_population()
+
+        # Start worker processes, each holding a warehouse of this instance
+        self.close_pool()
+        if self.workers > 1:
+            self.pool = multiprocessing.Pool(self.workers, initializer=init_worker,
+                                             initargs=(W, H, S, u, alpha, w_i, v_i, self.penalty, self.warehouse.travel_distances))
+
+    def close_writer(self):
+        # Write everything that is queued and stop the writer
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+    def close_pool(self):
+        # Stop worker processes
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
     def run(self, instance, allow_infeasible_parents=True):
         # Diagnostics
         global iterStartTime
@@ -84,9 +203,19 @@ class GeneticAlgorithm:
         if self.log_to_console:
             print("Instance instantiated")
 
+        # Log children to the generations file, a retry keeps logging to the file of its instance
+        filename = "data/generations/inst" + str(instance) + ".csv"
+        if self.save_generations and (self.generations is None or self.generations.path != filename):
+            self.generations = GenerationLog(filename, self.N)
+
         # Create initial population
         self.create_initial_population(min_feasible=int(self.fittest_size * self.population_size))  # We should at least have a mother and a father
 
+        # Write solutions and diagnostics in the background
+        self.close_writer()
+        self.writer = BackgroundWriter()
+        self.written_solution_key = None
+
         # Iterate
         last_improvement = 0
         while last_improvement < 1:
@@ -107,7 +236,10 @@ class GeneticAlgorithm:
                     iterStartTime = datetime.now()
 
                 # Create next population
-                self.create_next_population(allow_infeasible_parents=allow_infeasible_parents)
+                if self.steady_state:
+                    self.create_steady_state_population(allow_infeasible_parents=allow_infeasible_parents)
+                else:
+                    self.create_next_population(allow_infeasible_parents=allow_infeasible_parents)
 
                 # Set fittest objective value
                 fittest = self.select_fittest(1, allow_infeasible=True)
@@ -130,13 +262,13 @@ class GeneticAlgorithm:
                         'fittest_obj_value': self.fittest_obj_value
                     })
 
+                # Write output if the solution changed
                 solution = self.get_final_solution()
-                if solution is not None:
+                if solution is not None and get_chromosome_key(solution[0], self.N) != self.written_solution_key:
                     self.warehouse.process(solution[0])
-
-                    # Write output
-                    write_instance(instance, self.warehouse.total_travel_distance if self.warehouse.feasible else -1,
-                                   self.warehouse.get_PA_dimensions(ordered=True))
+                    self.writer.write_solution(instance, self.warehouse.total_travel_distance if self.warehouse.feasible else -1,
+                                               self.warehouse.get_PA_dimensions(ordered=True))
+                    self.written_solution_key = get_chromosome_key(solution[0], self.N)
 
             # Log
             if self.log_to_console:
@@ -151,12 +283,18 @@ class GeneticAlgorithm:
                 else:
                     print("\r\nObjective value did not improve")
 
+        # Write everything that is queued
+        self.close_writer()
+
         # Get final solution, this returns None if there is no feasible solution
         solution = self.get_final_solution()
 
         # If we have a solution, report on it
         if solution is not None:
 
+            # The warehouse holds the last chromosome it processed, which need not be the solution
+            self.warehouse.process(solution[0])
+
             # Log
             if self.log_to_console:
                 print("\r\nA feasible solution was found")
@@ -169,6 +307,8 @@ class GeneticAlgorithm:
                           np.mean([float(x['time'].total_seconds()) for x in run_diagnostics]), "s")
                     print("Average number of feasible solutions every iteration:",
                           np.mean([x['feasible_solutions'] for x in run_diagnostics]))
+                    print("Fitness cache hit rate:", round(self.get_cache_hit_rate() * 100, 2), "%")
+                    print("Evaluations saved by the feasibility pre-check:", self.precheck_rejections)
 
         else:
             # Log
@@ -191,9 +331,12 @@ class GeneticAlgorithm:
             solution = self.select_fittest(1, allow_infeasible=True)[0]
 
         # Process solution
-        self.warehouse.animate = True
+        self.warehouse.animate = self.animate_solution
         self.warehouse.process(solution[0])
-        self.warehouse.draw()
+
+        # Show solution, the headless renderer only saves it
+        if self.renderer != "raster":
+            self.warehouse.draw()
 
         # Draw solution as a PNG
         filename = f'output/sol{instance}.png'
@@ -203,9 +346,12 @@ class GeneticAlgorithm:
         write_instance(instance, self.warehouse.total_travel_distance if self.warehouse.feasible else -1,
                        self.warehouse.get_PA_dimensions(ordered=True))
 
+        # Stop worker processes
+        self.close_pool()
+
         # Save generations
-        if self.save_generations:
-            self.generations.to_csv("data/generations/inst" + str(instance) + ".csv")
+        if self.save_generations and self.generations is not None:
+            self.generations.flush()
 
         # Diagnostics
         if self.enable_diagnostics:
@@ -241,6 +387,87 @@ class GeneticAlgorithm:
             # plt.savefig(filename)
             # plt.show()
 
+    def run_islands(self, instance, islands=4, migration_interval=10, migration_size=2):
+        # Warehouse to write the final solution, the islands instantiate their own warehouse and worker processes
+        W, H, N, w_i, v_i, S, alpha, u, mean_u = read_instance(instance)
+        self.warehouse = Warehouse(W, H, S, u, alpha, animate=False, w_i=w_i, v_i=v_i, penalty=self.penalty,
+                                   renderer=self.renderer)
+        self.instance = instance
+        self.N = N
+        if not os.path.isdir(f'data/diagnostics/instance{instance}'):
+            os.mkdir(f'data/diagnostics/instance{instance}')
+
+        # Settings of every island, evaluating in its own process
+        settings = dict(population_size=self.population_size, iterations=self.iterations,
+                        fittest_size=self.fittest_size, random_size=self.random_size, children_size=self.children_size,
+                        penalty=self.penalty, initial_random_factor=self.initial_random_factor, save_generations=False,
+                        log_to_console=False, cache_size=self.cache_size, precheck=self.precheck)
+
+        # Start islands
+        connections = []
+        processes = []
+        for island in range(islands):
+            connection, island_connection = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=run_island, args=(
+                island_connection, instance, settings, island, int(np.random.randint(2 ** 31)), migration_interval,
+                migration_size))
+            process.start()
+            island_connection.close()
+            connections.append(connection)
+            processes.append(process)
+
+        # Log
+        if self.log_to_console:
+            print("Started", islands, "islands")
+
+        # Migrate until the fittest chromosome of all islands did not improve for a set of iterations, feasible
+        # chromosomes are fitter than infeasible ones
+        fittest_key = (True, math.inf)
+        last_improvement = 0
+        self.generation_number = 0
+        while last_improvement < self.iterations:
+            # Fittest chromosomes of every island
+            fittest = [connection.recv() for connection in connections]
+            self.generation_number = self.generation_number + migration_interval
+            last_improvement = last_improvement + migration_interval
+
+            # Keep track of improvement
+            key = min((not x[2], x[1]) for chromosomes in fittest for x in chromosomes)
+            if key < fittest_key:
+                fittest_key = key
+                self.fittest_obj_value = key[1]
+                last_improvement = 0
+
+                # Log
+                if self.log_to_console:
+                    print("Generation", self.generation_number, "objective value", self.fittest_obj_value,
+                          "feasible" if not key[0] else "infeasible")
+
+            # Send the fittest chromosomes of every island to the next island, or stop the islands
+            for island, connection in enumerate(connections):
+                connection.send(fittest[island - 1] if last_improvement < self.iterations else None)
+
+        # Final solutions of all islands
+        solutions = [connection.recv() for connection in connections]
+        for process in processes:
+            process.join()
+
+        # Take the fittest feasible solution, or the fittest infeasible one
+        solution = min(solutions, key=lambda x: (not x[2], x[1]))
+
+        # Write output
+        self.warehouse.process(solution[0])
+        write_instance(instance, self.warehouse.total_travel_distance if self.warehouse.feasible else -1,
+                       self.warehouse.get_PA_dimensions(ordered=True))
+
+        # Log
+        if self.log_to_console:
+            print("\r\nFittest chromosome:", solution[0])
+            print("Total distance:", solution[1], "feasible:", solution[2])
+
+        # Return solution
+        return solution
+
     def save_diagnostics(self, solution, run_diagnostics):
         # Get x and y
         generations = [x['generation'] for x in run_diagnostics]
@@ -264,7 +491,8 @@ class GeneticAlgorithm:
                 columns=["population_size", "elite_size", "children_size", "iteration_time", "total_time",
                          "number_of_generations", "objective_value", "penalty", "chromosome", "mutation_probs",
                          "original_mutation_probs",
-                         "mutation_names", "generations_progress", "objective_value_progress"])
+                         "mutation_names", "generations_progress", "objective_value_progress", "cache_hits",
+                         "cache_misses", "cache_hit_rate", "precheck_rejections"])
         # Append row
         df = df.append({
             "population_size": self.population_size,
@@ -282,7 +510,11 @@ class GeneticAlgorithm:
             "mutation_occurences": "|".join([str(x) for x in self.mutation_occurences]),
             "mutation_names": "|".join(self.mutation_names),
             "generations_progress": "|".join([str(x) for x in generations]),
-            "objective_value_progress": "|".join([str(x) for x in objective_value])
+            "objective_value_progress": "|".join([str(x) for x in objective_value]),
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "cache_hit_rate": round(self.get_cache_hit_rate(), 4),
+            "precheck_rejections": self.precheck_rejections
         }, ignore_index=True)
 
         # Save diagnostics
@@ -326,56 +558,60 @@ class GeneticAlgorithm:
         feasible = 0
         total_generated_chromosomes = 0
         feasible_generator_used = False
-        while len(self.population) < self.population_size:
-            total_generated_chromosomes = total_generated_chromosomes + 1
+        while self.population_count < self.population_size:
+            # Create and process a batch of random chromosomes, a full population as long as we need feasible ones
+            size = self.population_size if feasible < min_feasible else self.population_size - self.population_count
+            chromosomes = self.create_random_chromosomes(size)
+            obj_values, feasibilities = self.evaluate(chromosomes)
 
-            # Create random chromosome
-            chromosome = self.create_random_chromosome()
+            for chromosome, obj_value, feasibility in zip(chromosomes, obj_values, feasibilities):
+                # Stop if the population is complete
+                if self.population_count >= self.population_size:
+                    break
 
-            # Process chromosome
-            obj_value, feasibility = self.warehouse.process(chromosome)
+                total_generated_chromosomes = total_generated_chromosomes + 1
 
-            # Set item
-            item = (chromosome, obj_value, feasibility)
+                # Set item
+                item = (chromosome, obj_value, feasibility)
 
-            # Add only feasible solutions
-            if feasible < min_feasible and item[2] is True or feasible >= min_feasible:
-                # Add to population
-                self.population.append(item)
+                # Add only feasible solutions
+                if feasible < min_feasible and item[2] is True or feasible >= min_feasible:
+                    # Add to population
+                    self.add_to_population(*item)
 
-                # Number of feasible items
-                if item[2]:
-                    feasible = feasible + 1
-            elif total_generated_chromosomes > (self.population_size * self.initial_random_factor) and not feasible_generator_used:
-                # Log to console
-                if self.log_to_console:
-                    print("No feasible solutions found as of yet, trying to generate them systematically")
+                    # Number of feasible items
+                    if item[2]:
+                        feasible = feasible + 1
+                elif total_generated_chromosomes > (self.population_size * self.initial_random_factor) and not feasible_generator_used:
+                    # Log to console
+                    if self.log_to_console:
+                        print("No feasible solutions found as of yet, trying to generate them systematically")
 
-                # Generate feasible chromosomes
-                feasible_solutions = generate_feasible_solutions(algorithm=self, max_solutions=self.fittest_size * self.population_size, max_run_time=7200, iteration=self.iteration)
-                feasible_generator_used = True
+                    # Generate feasible chromosomes
+                    feasible_solutions = generate_feasible_solutions(algorithm=self, max_solutions=self.fittest_size * self.population_size, max_run_time=7200, iteration=self.iteration)
+                    feasible_generator_used = True
 
-                # Log to console
-                if self.log_to_console and len(feasible_solutions) == 0:
-                    print("Could not find enough feasible solutions, adding random chromosomes instead")
+                    # Log to console
+                    if self.log_to_console and len(feasible_solutions) == 0:
+                        print("Could not find enough feasible solutions, adding random chromosomes instead")
 
-                # Append to population
-                feasible_solutions.sort(key=lambda x: x[1])
-                for solution in feasible_solutions:
-                    if len(self.population) < self.population_size:
-                        # Unpack
-                        chromosome, obj_value, feasibility = solution
+                    # Append to population
+                    feasible_solutions.sort(key=lambda x: x[1])
+                    for solution in feasible_solutions:
+                        if self.population_count < self.population_size:
+                            # Unpack
+                            chromosome, obj_value, feasibility = solution
 
-                        # Add to population
-                        self.add_to_population(chromosome, obj_value=obj_value, feasibility=feasibility)
+                            # Add to population
+                            self.add_to_population(chromosome, obj_value=obj_value, feasibility=feasibility)
 
-                        # Number of feasible items
-                        feasible = feasible + 1
+                            # Number of feasible items
+                            feasible = feasible + 1
 
-            # Fill with random chromosomes
-            elif feasible_generator_used:
-                # Add to population
-                self.population.append(item)
+                # Fill with random chromosomes
+                elif feasible_generator_used:
+                    # Add to population
+                    self.add_to_population(*item)
 
     def create_next_population(self, fittest_size=None, children_size=None, allow_infeasible_parents=True):
         # Next generation
@@ -386,16 +622,18 @@ class GeneticAlgorithm:
         self.children_size = children_size if children_size is not None else self.children_size
 
         # Select fittest chromosomes
-        fittest = self.select_fittest(int(self.fittest_size * self.population_size),
-                                      allow_infeasible=allow_infeasible_parents)
-        fittest_chromosomes = list(map(get_chromosomes, fittest))
+        fittest = self.select_fittest_indices(int(self.fittest_size * self.population_size),
+                                              allow_infeasible=allow_infeasible_parents)
+        fittest_chromosomes = self.population[fittest]
+        fittest_obj_values = self.obj_values[fittest]
+        fittest_feasibilities = self.feasibilities[fittest]
 
         # Select random chromosomes
-        randoms = sample(self.population, int(self.random_size * self.population_size))
-        random_chromosomes = list(map(get_chromosomes, randoms))
+        randoms = sample(range(self.population_count), int(self.random_size * self.population_size))
+        random_chromosomes = self.population[randoms]
 
         # Create parents
-        parent_chromosomes = fittest_chromosomes + random_chromosomes
+        parent_chromosomes = np.concatenate([fittest_chromosomes, random_chromosomes])
 
         # Create children from fittest chromosomes
         if len(fittest) > 0:
@@ -405,8 +643,8 @@ class GeneticAlgorithm:
             children = []
 
         # Create new population
-        self.population = []
-        for chromosome, obj_value, feasibility in fittest:
+        self.clear_population()
+        for chromosome, obj_value, feasibility in zip(fittest_chromosomes, fittest_obj_values, fittest_feasibilities):
             if not self.population_contains(chromosome):
                 # Append to population
                 self.add_to_population(chromosome, obj_value=obj_value, feasibility=feasibility, process=False)
@@ -429,7 +667,7 @@ class GeneticAlgorithm:
                     number = number + 1
 
         # Fill population with random chromosomes
-        while len(self.population) < self.population_size:
+        while self.population_count < self.population_size:
             # Create random chromosome
             chromosome = self.create_random_chromosome()
 
@@ -438,132 +676,252 @@ class GeneticAlgorithm:
                 self.add_to_population(chromosome, process=True)
 
         # Save mutations
-        try:
-            df = pd.read_csv(f'data/diagnostics/instance{self.instance}/mutations.csv')
-        except:
-            df = pd.DataFrame(columns=self.mutation_names)
+        self.save_mutation_probs()
 
-        # Append row
-        obj = {}
-        index = 0
-        for prob in self.mutation_probs:
-            obj[self.mutation_names[index]] = prob
-            index = index + 1
+        # Return new population
+        return self.population[:self.population_count]
+
+    def create_steady_state_population(self, steady_state_size=None, allow_infeasible_parents=True):
+        # Next generation
+        self.generation_number = self.generation_number + 1
 
-        df = df.append(obj, ignore_index=True)
+        # Set the fraction of the population of children we make
+        self.steady_state_size = steady_state_size if steady_state_size is not None else self.steady_state_size
 
-        # Save diagnostics
-        df.to_csv(f'data/diagnostics/instance{self.instance}/mutations.csv', index=False)
+        # Select fittest and random chromosomes as parents
+        fittest = self.select_fittest_indices(int(self.fittest_size * self.population_size),
+                                              allow_infeasible=allow_infeasible_parents)
+        randoms = sample(range(self.population_count), int(self.random_size * self.population_size))
+        parent_chromosomes = self.population[np.concatenate([fittest, randoms]).astype(int)]
 
-        # Return new population
-        return self.population
+        # Create children from fittest chromosomes
+        if len(fittest) > 0:
+            children = self.create_children(parent_chromosomes,
+                                            max(1, int(self.steady_state_size * self.population_size)))
+        else:
+            children = []
+
+        # Heap of the worst members, feasible members are fitter than infeasible ones
+        if self.worst_heap is None:
+            self.worst_heap = [(bool(self.feasibilities[index]), -float(self.obj_values[index]), index)
+                               for index in range(self.population_count)]
+            heapq.heapify(self.worst_heap)
+
+        # Children replace the worst member if they are fitter and not in the population already
+        for chromosome, obj_value, feasibility in children:
+            feasible, negative_obj_value, index = self.worst_heap[0]
+            if (bool(feasibility), -obj_value) > (feasible, negative_obj_value) and \
+                    not self.population_contains(chromosome):
+                heapq.heapreplace(self.worst_heap, (bool(feasibility), -obj_value, index))
+                self.update(index, chromosome, obj_value, feasibility)
+
+        # Save mutations
+        self.save_mutation_probs()
+
+        # Return population
+        return self.population[:self.population_count]
+
+    def save_mutation_probs(self):
+        # Save mutations, in the background during a run, islands save to a file per island
+        path = f'data/diagnostics/instance{self.instance}/mutations.csv'
+        if self.island is not None:
+            path = f'data/diagnostics/instance{self.instance}/mutations_island{self.island}.csv'
+        if self.writer is not None:
+            self.writer.append_row(path, self.mutation_names, self.mutation_probs)
+        else:
+            append_rows(path, self.mutation_names, [self.mutation_probs])
+
+    def clear_population(self):
+        # Empty population with room for a complete population
+        self.population = np.zeros((self.population_size, 3 * self.N))
+        self.obj_values = np.full(self.population_size, np.nan)
+        self.feasibilities = np.zeros(self.population_size, dtype=bool)
+        self.population_count = 0
+        self.population_keys = collections.Counter()
+        self.worst_heap = None
 
     def add_to_population(self, chromosome, obj_value=None, feasibility=None, process=False):
         # Process the item if required
         if process is True:
             # Process chromosome
-            obj_value, feasibility = self.warehouse.process(chromosome)
-
-            # Set item
-            item = (chromosome, obj_value, feasibility)
+            obj_value, feasibility = self.process(chromosome)
+
+        # Double the room if the population is full
+        if self.population_count == len(self.population):
+            size = max(1, len(self.population))
+            self.population = np.concatenate([self.population, np.zeros((size, 3 * self.N))])
+            self.obj_values = np.concatenate([self.obj_values, np.full(size, np.nan)])
+            self.feasibilities = np.concatenate([self.feasibilities, np.zeros(size, dtype=bool)])
+
+        # Add item, a chromosome that was not processed has no objective value
+        self.population[self.population_count] = chromosome
+        self.obj_values[self.population_count] = obj_value if obj_value is not None else np.nan
+        self.feasibilities[self.population_count] = feasibility is not None and bool(feasibility)
+        self.population_count = self.population_count + 1
+        self.population_keys[get_chromosome_key(chromosome, self.N)] += 1
+        self.worst_heap = None
+
+    def process(self, chromosome):
+        # Process a single chromosome through the fitness cache
+        obj_values, feasibilities = self.evaluate([chromosome])
+
+        # Return travel distance and feasibility
+        return obj_values[0], feasibilities[0]
+
+    def evaluate(self, chromosomes, precheck=None):
+        # Certainly infeasible chromosomes get the lower bound of their objective value instead of being placed
+        precheck = self.precheck if precheck is None else precheck
+        bounds, rejected = np.zeros(len(chromosomes)), np.zeros(len(chromosomes), dtype=bool)
+        if precheck and len(chromosomes) > 0:
+            bounds, rejected = self.warehouse.precheck_many(chromosomes)
+            self.precheck_rejections = self.precheck_rejections + int(rejected.sum())
+
+        # Look up chromosomes in the fitness cache, chromosomes with equal keys are processed once
+        keys = [None if rejected[i] else get_chromosome_key(chromosome, self.N) for i, chromosome in enumerate(chromosomes)]
+        unknown = {}
+        for key, chromosome in zip(keys, chromosomes):
+            if key is None:
+                continue
+            elif key in self.fitness_cache:
+                self.fitness_cache.move_to_end(key)
+                self.cache_hits = self.cache_hits + 1
+            elif key not in unknown:
+                unknown[key] = chromosome
+                self.cache_misses = self.cache_misses + 1
+            else:
+                self.cache_hits = self.cache_hits + 1
+
+        # Process unknown chromosomes and add them to the cache
+        if len(unknown) > 0:
+            obj_values, feasibilities = self.process_chromosomes(list(unknown.values()))
+            for key, obj_value, feasibility in zip(unknown.keys(), obj_values, feasibilities):
+                self.fitness_cache[key] = (obj_value, feasibility)
+
+        # Gather results before the cache is reduced
+        results = [(float(bound), False) if key is None else self.fitness_cache[key] for key, bound in zip(keys, bounds)]
+
+        # Remove least recently used
+        while len(self.fitness_cache) > self.cache_size:
+            self.fitness_cache.popitem(last=False)
+
+        # Return objective values and feasibilities
+        return [x[0] for x in results], [x[1] for x in results]
+
+    def get_cache_hit_rate(self):
+        # Fraction of evaluations answered by the fitness cache
+        evaluations = self.cache_hits + self.cache_misses
+        return self.cache_hits / evaluations if evaluations > 0 else 0
+
+    def process_chromosomes(self, chromosomes):
+        if self.pool is not None and len(chromosomes) > 1:
+            # Split chromosomes into one contiguous batch per worker, results are returned in the same order
+            batches = np.array_split(np.arange(len(chromosomes)), min(self.workers, len(chromosomes)))
+            results = self.pool.map(process_batch, [[chromosomes[i] for i in batch] for batch in batches])
+            obj_values = np.concatenate([result[0] for result in results])
+            feasibilities = np.concatenate([result[1] for result in results])
         else:
-            # Set item
-            item = (chromosome, obj_value, feasibility)
+            # Process all chromosomes at once
+            obj_values, feasibilities = self.warehouse.process_many(chromosomes)
 
-        # Add item
-        self.population.append(item)
+        # Return as Python floats and booleans, the population is checked with `is True`
+        return [float(x) for x in obj_values], [bool(x) for x in feasibilities]
 
     def population_contains(self, chromosome):
-        # Stringify each chromosome
-        str_chromosomes = list(map(get_chromosomes_as_string, self.population))
-
-        # Stringify chromosome
-        str_chromosome = "-".join(str(x) for x in chromosome)
+        # Return if a chromosome with an equal key is in the population
+        return self.population_keys[get_chromosome_key(chromosome, self.N)] > 0
 
-        # Return
-        return str_chromosome in str_chromosomes
+    def get_item(self, index):
+        # Chromosome, objective value and feasibility of a member of the population
+        return self.population[index].tolist(), float(self.obj_values[index]), bool(self.feasibilities[index])
 
     def get_feasible_solutions(self):
         # Filter population by feasible solutions
-        return list(filter(lambda x: x[2] == True, self.population))
+        return [self.get_item(index) for index in np.flatnonzero(self.feasibilities[:self.population_count])]
 
     def contains_feasible_solution(self):
         # If len > 0, it contains at least one feasible solution
         return len(self.get_feasible_solutions()) > 0
 
     def assess_population(self, process):
-        index = 0
-        for chromosome, obj_value, feasibility in self.population:
-            if obj_value is None and feasibility is None:
-                # Get values
-                obj_value, feasibility = process(chromosome)
+        for index in np.flatnonzero(np.isnan(self.obj_values[:self.population_count])):
+            # Get values
+            chromosome = self.get_chromosome(index)
+            obj_value, feasibility = process(chromosome)
 
-                # Set values
-                self.update(index, chromosome, obj_value, feasibility)
-
-                # Increment index
-                index = index + 1
+            # Set values
+            self.update(index, chromosome, obj_value, feasibility)
 
-    def select_fittest(self, size, allow_infeasible=False):
-        # Feasible population
-        feasible_population = sorted(filter(lambda x: x[2] == True, self.population), key=lambda tup: tup[1])
+    def select_fittest_indices(self, size, allow_infeasible=False):
+        # Views of the population
+        obj_values = self.obj_values[:self.population_count]
+        feasibilities = self.feasibilities[:self.population_count]
 
-        # Select fittest
-        fittest_feasible = feasible_population[:min(size, len(feasible_population))]
+        # Fittest feasible and infeasible chromosomes, a stable sort keeps the population order of equal objective values
+        feasible = np.flatnonzero(feasibilities)
+        fittest_feasible = feasible[np.argsort(obj_values[feasible], kind="stable")][:size]
+        infeasible = np.flatnonzero(~feasibilities)
+        fittest_infeasible = infeasible[np.argsort(obj_values[infeasible], kind="stable")][:size]
 
-        # Sort population
-        infeasible_population = sorted(filter(lambda x: x[2] == False, self.population), key=lambda tup: tup[1])
+        # Return indexes of fittest
+        return np.concatenate([fittest_feasible, fittest_infeasible])[:size]
 
-        # Fittest infeasible
-        fittest_infeasible = infeasible_population[:min(size, len(infeasible_population))]
+    def select_fittest(self, size, allow_infeasible=False):
+        # Return fittest items
+        return [self.get_item(index) for index in self.select_fittest_indices(size, allow_infeasible=allow_infeasible)]
+
+    def crossover(self, chromosomes, size):
+        # Parents as a matrix with one chromosome per row
+        chromosomes = np.array(chromosomes, dtype=float).reshape(len(chromosomes), -1)
+
+        # Get indexes of which two parents we inherit the order, two different parents drawn uniformly if possible
+        if len(chromosomes) > 1:
+            first = np.random.randint(0, len(chromosomes), size=size)
+            second = np.random.randint(0, len(chromosomes) - 1, size=size)
+            second[second >= first] = second[second >= first] + 1
+
+            # Mother is always fittest, father is least fit
+            mother_indexes = np.minimum(first, second)
+            father_indexes = np.maximum(first, second)
+        else:
+            # We only have a single parent
+            mother_indexes, father_indexes = np.zeros(size, dtype=int), np.zeros(size, dtype=int)
 
-        # Fittest
-        fittest = fittest_feasible + fittest_infeasible
+        # Decide on mother and father chromosomes
+        mothers, fathers = chromosomes[mother_indexes], chromosomes[father_indexes]
 
-        # Return fittest
-        return fittest[:min(size, len(fittest))]
+        # Take the average of both parents as the new order
+        orders = ((mothers[:, :self.N] + fathers[:, :self.N]) / 2).round(2)
 
-    def create_children(self, chromosomes, size):
-        children = []
-        for i in np.arange(size):
-            # Get indexes of which two parents we inherit the order
-            if len(chromosomes) > 1:
-                # Get random indexes
-                indexes = sample(range(len(chromosomes)), 2)
-
-                # Mother is always fittest, father is least fit
-                mother_index = min(indexes)
-                father_index = max(indexes)
-            else:
-                # We only have a single parent
-                mother_index, father_index = 0, 0
+        # Take the number of aisles and cross-aisles from the mother or father with 50/50 chance
+        from_mother = np.random.random_sample((size, 2 * self.N)) < .5
+        genes = np.where(from_mother, mothers[:, self.N:], fathers[:, self.N:])
 
-            # Decide on mother and father chromosome
-            mother, father = chromosomes[mother_index], chromosomes[father_index]
+        # Return parents and children
+        return mothers, fathers, np.concatenate([orders, genes], axis=1)
 
-            # Take the average of both parents as the new order
-            order = np.array((np.array(mother[:self.N]) + np.array(father[:self.N])) / 2).round(2)
-
-            # Take the number of aisles from the mother or father with 50/50 chance
-            aisles = []
-            for index in np.arange(self.N, 2 * self.N):
-                aisles.append(mother[index] if random() < .5 else father[index])
+    def create_children(self, chromosomes, size):
+        # Create all children at once
+        mothers, fathers, child_chromosomes = self.crossover(chromosomes, size)
 
-            # Take the number of cross-aisles from the mother or father with 50/50 chance
-            cross_aisles = []
-            for index in np.arange(2 * self.N, 3 * self.N):
-                cross_aisles.append(mother[index] if random() < .5 else father[index])
+        # Mutate all children first, such that they can be evaluated at once
+        mutated_chromosomes, mutation_names = self.mutate_many(child_chromosomes.copy())
 
-            # Create child
-            child_chromosome = [*order, *aisles, *cross_aisles]
+        brood = []
+        for mother, father, child, mutated, mutation_name in zip(mothers, fathers, child_chromosomes,
+                                                                 mutated_chromosomes, mutation_names):
+            # Child as it was mutated
+            pre_mutated_child = child.tolist()
+            mutated_chromosome = mutated.tolist()
+            child_chromosome = mutated_chromosome
 
-            # Mutate child
-            pre_mutated_child = [*order, *aisles, *cross_aisles]
-            mutated_chromosome, mutation_name = self.mutate(child_chromosome)
+            # Add to brood
+            brood.append((mother, father, child_chromosome, pre_mutated_child, mutated_chromosome, mutation_name))
 
-            # Evaluate child
-            obj_value, feasibility = self.warehouse.process(mutated_chromosome)
+        # Evaluate children
+        obj_values, feasibilities = self.evaluate([x[4] for x in brood])
 
+        children = []
+        for (mother, father, child_chromosome, pre_mutated_child, mutated_chromosome, mutation_name), obj_value, feasibility in zip(brood, obj_values, feasibilities):
             # Mutation points
             if self.fittest_obj_value > obj_value and self.mutation_points[self.mutation_names.index(mutation_name)] < 100000:
                 self.mutation_points[self.mutation_names.index(mutation_name)] = self.mutation_points[self.mutation_names.index(mutation_name)] + 1
@@ -575,17 +933,13 @@ class GeneticAlgorithm:
                         self.mutation_points[i] = self.mutation_points[i] + 1
 
             # Save generations
-            if self.save_generations:
+            if self.save_generations and self.generations is not None:
                 # Calculate mutations
                 mutation = np.array(np.array(pre_mutated_child) - np.array(mutated_chromosome)).round(2)
 
-                # Save a tuple of fittest chromosomes and corresponding child chromosomes
-                self.generations = self.generations.append(
-                    {'generation': self.generation_number, 'mother': '|'.join(str(x) for x in mother),
-                     'father': '|'.join(str(x) for x in father), 'child': '|'.join(str(x) for x in child_chromosome),
-                     'mutation_name': mutation_name, 'obj_value': str(obj_value), 'feasibility': str(feasibility),
-                     'mutation': '|'.join(str(x) for x in mutation), 'child_no': len(children) + 1},
-                    ignore_index=True)
+                # Save the fittest chromosomes and corresponding child chromosome
+                self.generations.append(self.generation_number, len(children) + 1, mutation_name, obj_value,
+                                        feasibility, mother, father, child_chromosome, mutation)
 
             # Append child
             children.append((mutated_chromosome, obj_value, feasibility))
@@ -619,19 +973,58 @@ class GeneticAlgorithm:
         # Return mutated chromosome
         return (chromosome, mutation_name)
 
+    def mutate_many(self, chromosomes):
+        # Get which mutation to apply to every chromosome
+        total_mutation_points = sum(self.mutation_points)
+        self.mutation_probs = [x / total_mutation_points for x in self.mutation_points]
+        mutation_names = np.random.choice(self.mutation_names, len(chromosomes), self.mutation_probs)  # Chooses a random mutation according to the specified distribution
+
+        # Apply every mutation once to all chromosomes it was chosen for
+        for mutation_name in self.mutation_names:
+            mask = mutation_names == mutation_name
+            if mask.any():
+                chromosomes = batch_mutations[mutation_name](self, chromosomes, mask)
+
+                # Keep diagnostics
+                if self.enable_diagnostics:
+                    self.mutation_occurences[self.mutation_names.index(mutation_name)] = self.mutation_occurences[self.mutation_names.index(mutation_name)] + int(mask.sum())
+
+        # Final check for absolute maximum of aisles and cross-aisles
+        chromosomes[:, self.N:2 * self.N] = np.clip(chromosomes[:, self.N:2 * self.N], 1, 30)
+        chromosomes[:, 2 * self.N:3 * self.N] = np.clip(chromosomes[:, 2 * self.N:3 * self.N], 2, 10)
+
+        # Return mutated chromosomes
+        return chromosomes, [str(x) for x in mutation_names]
+
+    def add_migrants(self, migrants):
+        # Migrants replace the worst members of the population, infeasible ones first, unless they are in the
+        # population already
+        migrants = [x for x in migrants if not self.population_contains(x[0])]
+        worst = np.lexsort((-self.obj_values[:self.population_count], self.feasibilities[:self.population_count]))
+        worst = worst[:len(migrants)]
+        for index, (chromosome, obj_value, feasibility) in zip(worst, migrants):
+            self.update(index, chromosome, obj_value, feasibility)
+        self.worst_heap = None
+
     def get_chromosome(self, index):
         # Get chromosome from population
-        chromosome = self.population[index][0]
+        chromosome = self.population[index].tolist()
 
         # Return chromosome
         return chromosome
 
     def update(self, index, chromosome, obj_value, feasibility):
+        # Replace key
+        self.population_keys[get_chromosome_key(self.population[index], self.N)] -= 1
+        self.population_keys[get_chromosome_key(chromosome, self.N)] += 1
+
         # Set
-        self.population[index] = (chromosome, obj_value, feasibility)
+        self.population[index] = chromosome
+        self.obj_values[index] = obj_value
+        self.feasibilities[index] = feasibility
 
         # Return updated
-        return self.population[index]
+        return self.get_item(index)
 
     def get_fittest_chromosome(self):
         return self.select_fittest(1)[0][0]
@@ -1,12 +1,11 @@
 from functions import lookup_travel_distance
-from matplotlib.patches import Rectangle
 import math
 from random import random
 import numpy as np
 import itertools
 
 class PickingArea:
-    def __init__(self, s_i, n, k, m, S, alpha, w_i, v_i, number, color):
+    def __init__(self, s_i, n, k, m, S, alpha, w_i, v_i, number, color, travel_distances=None, properties=None):
         # Set storage capacity
         self.s_i = s_i
 
@@ -19,6 +18,9 @@ class PickingArea:
         self.v_i = v_i
         self.S = S
 
+        # Precomputed Ri and Ti for every number of aisles and cross-aisles, see create_travel_distance_table
+        self.travel_distances = travel_distances
+
         # Set position
         self.x = 0
         self.y = 0
@@ -31,22 +33,31 @@ class PickingArea:
         # Assume feasible
         self.feasible = True
 
-        # Calculate width and height
-        self.w = self.w_i * self.n
-        self.h = self.s_i / self.n + self.v_i * self.k
+        # Calculate width and height, or use the width, height, Ri and Ti calculated for a batch of chromosomes
+        self.distances = None
+        if properties is None:
+            self.w = self.w_i * self.n
+            self.h = self.s_i / self.n + self.v_i * self.k
+        else:
+            self.w, self.h, Ri, Ti = properties
+            self.distances = None if math.isnan(Ri) else (Ri, Ti)
         self.surface = self.w * self.h
 
         # Instantiate metrics
-        Ui = round(2*self.y * (1 + self.alpha), 2)
-        Ri = round(round(self.alpha,2) * round(lookup_travel_distance(self.n, self.k, 1, S=self.S, w=self.w_i, v=self.v_i),2), 2)
-        Ti = round(lookup_travel_distance(self.n, self.k, self.m, S=self.S, w=self.w_i, v=self.v_i), 2)
-
-        self.travel_distance = Ui + Ri + Ti
+        self.travel_distance = self.calculate_travel_distance()
         self.EMS = None
         self.EMS_options = []
         self.penalty = 0
 
     def set_parameters(self, n=None, k=None, m=None, alpha=None):
+        # The precomputed travel distances only hold for the original order distribution and replenishment
+        if m is not None or alpha is not None:
+            self.travel_distances = None
+
+        # Ri and Ti of a batch only hold for the original parameters
+        if n is not None or k is not None or m is not None or alpha is not None:
+            self.distances = None
+
         # Set parameters
         self.n = self.n if n is None else n
         self.k = self.k if k is None else k
@@ -58,12 +69,30 @@ class PickingArea:
         self.h = self.s_i / self.n + self.v_i * self.k
         self.surface = self.w * self.h
 
-        # Get travel distance from lookup
+        # Get travel distance
+        self.travel_distance = self.calculate_travel_distance()
+
+    def calculate_travel_distance(self):
+        # Travel distance to the position of the picking area
         Ui = round(2*self.y * (1 + self.alpha), 2)
+
+        # Use Ri and Ti of a batch if given
+        if self.distances is not None:
+            Ri, Ti = self.distances
+            return Ui + Ri + Ti
+
+        # Use the precomputed travel distances if the number of aisles and cross-aisles are integers within the lookup
+        # table, fractional numbers are looked up as the table only holds integers
+        if self.travel_distances is not None and 1 <= self.n <= 30 and 2 <= self.k <= 10 and \
+                float(self.n).is_integer() and float(self.k).is_integer():
+            Ri, Ti = self.travel_distances[int(self.n) - 1, int(self.k) - 2]
+            return Ui + Ri + Ti
+
+        # Get travel distance from lookup
         Ri = round(round(self.alpha,2) * round(lookup_travel_distance(self.n, self.k, 1, S=self.S, w=self.w_i, v=self.v_i),2), 2)
         Ti = round(lookup_travel_distance(self.n, self.k, self.m, S=self.S, w=self.w_i, v=self.v_i), 2)
 
-        self.travel_distance = Ui + Ri + Ti
+        return Ui + Ri + Ti
 
     def set_position(self, x, y):
         # Set position
@@ -97,6 +126,9 @@ class PickingArea:
             return self.penalty + self.travel_distance
 
     def get_rectangle(self):
+        # Import here, matplotlib is only loaded when drawing
+        from matplotlib.patches import Rectangle
+
         # Determine color
         color = self.color if self.feasible else "red"
 
@@ -0,0 +1,79 @@
+from PIL import Image, ImageDraw, ImageFont
+import math
+
+# Fonts by size, loaded once per process
+fonts = {}
+
+# Rendered labels by text and font size, as picking area labels repeat across layouts
+labels = {}
+
+
+def get_font(size):
+    # Load bundled font
+    if size not in fonts:
+        fonts[size] = ImageFont.truetype("data/arial.ttf", size)
+
+    # Return
+    return fonts[size]
+
+
+def get_label(text, font_size):
+    # Render centered text once as a mask
+    if (text, font_size) not in labels:
+        font = get_font(font_size)
+        left, top, right, bottom = ImageDraw.Draw(Image.new("L", (1, 1))).multiline_textbbox(
+            (0, 0), text, font=font, anchor="mm", align="center")
+        mask = Image.new("L", (math.ceil(right - left), math.ceil(bottom - top)))
+        ImageDraw.Draw(mask).multiline_text((-left, -top), text, fill=255, font=font, anchor="mm", align="center")
+        labels[(text, font_size)] = mask
+
+    # Return
+    return labels[(text, font_size)]
+
+
+def draw_label(image, text, x, y, color, font_size):
+    # Paste the label centered on x and y
+    mask = get_label(text, font_size)
+    image.paste(color[:3], (round(x - mask.width / 2), round(y - mask.height / 2)), mask)
+
+
+def get_color(color, alpha=1.):
+    # Matplotlib colors as RGBA tuples of 0 to 255, either a named color or an RGB tuple of 0 to 1
+    if isinstance(color, str):
+        return {"red": (255, 0, 0), "black": (0, 0, 0), "white": (255, 255, 255)}[color] + (round(255 * alpha),)
+
+    return tuple(round(255 * x) for x in color) + (round(255 * alpha),)
+
+
+def render_layout(W, H, PA_list, width=640, height=480, margin=10, font_size=14):
+    # Canvas, the warehouse spans from the docking doors at -.1 * H to H
+    image = Image.new("RGB", (width, height), (255, 255, 255))
+    draw = ImageDraw.Draw(image, "RGBA")
+    scale_x = (width - 2 * margin) / W
+    scale_y = (height - 2 * margin) / (1.1 * H)
+
+    def to_box(x, y, w, h):
+        # Pixel box of a rectangle, with the y-axis pointing up
+        return [margin + x * scale_x, margin + (H - y - h) * scale_y, margin + (x + w) * scale_x,
+                margin + (H - y) * scale_y]
+
+    # Warehouse borders
+    draw.rectangle(to_box(0, 0, W, H), outline=(0, 0, 0, 255))
+
+    # Plot picking areas, infeasible ones in red
+    for PA in PA_list:
+        box = to_box(PA.x, PA.y, PA.w, PA.h)
+        draw.rectangle(box, fill=get_color(PA.color if PA.feasible else "red", alpha=.5))
+
+        # Annotate
+        content = PA.name + "\nn_" + str(PA.number) + "=" + str(round(PA.n)) + "\nk_" + str(PA.number) + "=" + str(
+            round(PA.k))
+        draw_label(image, content, (box[0] + box[2]) / 2, (box[1] + box[3]) / 2, get_color("black"), font_size)
+
+    # Plot and annotate docking doors
+    box = to_box(0, -.1 * H, W, .1 * H)
+    draw.rectangle(box, fill=get_color("black"))
+    draw_label(image, "Docking doors", (box[0] + box[2]) / 2, (box[1] + box[3]) / 2, get_color("white"), font_size)
+
+    # Return
+    return image
@@ -1,16 +1,17 @@
 import math
+from bisect import bisect_left, bisect_right
 import numpy as np
-from matplotlib import pyplot as plt
-import imageio
 from random import random
 from .picking_area import PickingArea
 from .empty_maximal_space import EmptyMaximalSpace
-from matplotlib.patches import Rectangle
+
+# Returned by Warehouse.process instead of the objective value if the chromosome is dominated by the given bound
+DOMINATED = "dominated"
 
 
 class Warehouse:
     def __init__(self, width, height, storage_capacities=[], order_sizes=[], replenishments=[], w_i=1, v_i=1, penalty=10,
-                 animate=False, save_history=True):
+                 animate=False, save_history=True, renderer="matplotlib"):
         # Set variables
         self.W = width
         self.H = height
@@ -32,6 +33,9 @@ class Warehouse:
         self.w_i = w_i
         self.v_i = v_i
 
+        # Precomputed Ri and Ti of shape (N, 30, 9, 2), see create_travel_distance_table
+        self.travel_distances = None
+
         # First EMS is complete warehouse
         self.EMS_list = [EmptyMaximalSpace(0, 0, width, height)]
 
@@ -47,8 +51,9 @@ class Warehouse:
         # Chromosome
         self.chromosome = ""
 
-        # Animation
+        # Animation, drawn with matplotlib or with the headless "raster" renderer
         self.animate = animate
+        self.renderer = renderer
         self.frame = 0
         self.frame_files = []
 
@@ -56,6 +61,10 @@ class Warehouse:
         self.save_history = save_history
         self.EMS_history = []
 
+        # State before every placement position and placement of the last processed chromosome
+        self.placement_states = [(self.EMS_list, 0, True, 0)]
+        self.placement = None
+
     def reset(self):
         # Reset lists
         self.EMS_list = [EmptyMaximalSpace(0, 0, self.W, self.H)]
@@ -67,10 +76,36 @@ class Warehouse:
         self.number_of_picking_areas = 0
         self.feasible = True
 
-    def process(self, chromosome):
-        # Reset
-        self.reset()
+        # Reset placement states
+        self.placement_states = [(self.EMS_list, 0, True, 0)]
+
+    def restore(self, placement, order, aisles, cross_aisles):
+        # Unpack placement of an earlier chromosome
+        placed_order, placed_aisles, placed_cross_aisles, placement_states, PA_list, EMS_history = placement
+
+        # First position at which the picking area, its aisles or its cross-aisles differ
+        position = 0
+        while position < min(len(order), len(placed_order)) and order[position] == placed_order[position] and \
+                aisles[order[position]] == placed_aisles[order[position]] and \
+                cross_aisles[order[position]] == placed_cross_aisles[order[position]]:
+            position = position + 1
+
+        # Restore the state before that position
+        self.placement_states, self.PA_list, self.EMS_history = placement_states, PA_list, EMS_history
+        self.restore_position(position)
 
+        # Return position from which picking areas must be placed
+        return position
+
+    def restore_position(self, position):
+        # Restore the state before the given placement position, undoing all later placements
+        self.EMS_list, self.total_travel_distance, self.feasible, history_length = self.placement_states[position]
+        self.EMS_history = self.EMS_history[:history_length]
+        self.PA_list = self.PA_list[:position]
+        self.number_of_picking_areas = position
+        self.placement_states = self.placement_states[:position + 1]
+
+    def process(self, chromosome, placement=None, bound=math.inf):
         # Set chromosome
         self.chromosome = "-".join(str(x) for x in chromosome)
 
@@ -83,36 +118,176 @@ class Warehouse:
         cross_aisles = chromosome[(2 * N):(3 * N)]
 
         # np.argsort converts the goncalves order to an array of indexes
-        for index in np.argsort(order):
+        order = np.argsort(order)
+
+        # Continue from the first position that differs from the given placement, or place all picking areas
+        position = 0
+        if placement is not None and not self.animate:
+            position = self.restore(placement, order, aisles, cross_aisles)
+        else:
+            self.reset()
+
+        # Place picking areas, stop if the objective value certainly exceeds the bound
+        if not self.place(order[position:], aisles, cross_aisles, bound=bound):
+            self.placement = None
+            return DOMINATED, None
+
+        self.placement = (order, aisles, cross_aisles, self.placement_states, self.PA_list, self.EMS_history)
+
+        # If we choose to animate the placement, we set animate to True
+        if self.animate:
+            # Create animation
+            self.create_animation(fps=.5)
+
+        # Return travel distance and feasibility
+        return round(self.total_travel_distance, 2), self.feasible
+
+    def process_many(self, chromosomes, incremental=False):
+        # Chromosomes as a matrix with one chromosome per row
+        chromosomes = np.array(chromosomes, dtype=float).reshape(len(chromosomes), -1)
+
+        # Determine number of picking areas
+        N = round(chromosomes.shape[1] / 3)
+
+        # Determine the order, sizes and travel distances of the picking areas of all chromosomes at once
+        orders = np.argsort(chromosomes[:, :N], axis=1)
+        aisles = chromosomes[:, N:(2 * N)]
+        cross_aisles = chromosomes[:, (2 * N):(3 * N)]
+        properties = self.get_picking_area_properties(aisles, cross_aisles)
+
+        # Objective values and feasibility of every chromosome
+        obj_values = np.zeros(len(chromosomes))
+        feasibilities = np.zeros(len(chromosomes), dtype=bool)
+
+        # Placement is sequential within a chromosome
+        for row in range(len(chromosomes)):
+            # Continue from the placement of the previous chromosome if incremental, or place all picking areas
+            position = 0
+            if incremental and row > 0:
+                position = self.restore(self.placement, orders[row], aisles[row], cross_aisles[row])
+            else:
+                self.reset()
+
+            # Place picking areas
+            self.place(orders[row][position:], aisles[row], cross_aisles[row], properties=properties[row].tolist())
+            self.placement = (orders[row], aisles[row], cross_aisles[row], self.placement_states, self.PA_list,
+                              self.EMS_history)
+
+            # Set travel distance and feasibility
+            obj_values[row] = round(self.total_travel_distance, 2)
+            feasibilities[row] = self.feasible
+
+        # Return travel distances and feasibilities
+        return obj_values, feasibilities
+
+    def precheck_many(self, chromosomes):
+        # Chromosomes as a matrix with one chromosome per row
+        chromosomes = np.array(chromosomes, dtype=float).reshape(len(chromosomes), -1)
+
+        # Determine number of picking areas
+        N = round(chromosomes.shape[1] / 3)
+        aisles = chromosomes[:, N:(2 * N)]
+        cross_aisles = chromosomes[:, (2 * N):(3 * N)]
+
+        # Picking area sizes and travel distances
+        properties = self.get_picking_area_properties(aisles, cross_aisles)
+        widths, heights = properties[:, :, 0], properties[:, :, 1]
+
+        # A picking area wider or taller than the warehouse fits in no EMS
+        oversized = (widths > self.W) | (heights > self.H)
+
+        # If the other picking areas cover more than the warehouse, at least one of them does not fit either
+        overfull = np.where(oversized, 0, widths * heights).sum(axis=1) > self.surface
+        infeasible = oversized.sum(axis=1) + overfull
+
+        # Lower bound of the objective value, every picking area travels at least Ri + Ti and every picking area that
+        # does not fit adds the penalty, picking areas are placed at y = 0 if they do not fit
+        travel_distances = np.nan_to_num(properties[:, :, 2:].sum(axis=-1)).sum(axis=1)
+
+        # Return lower bounds and which chromosomes are certainly infeasible
+        return travel_distances + self.penalty * infeasible, infeasible > 0
+
+    def get_picking_area_properties(self, aisles, cross_aisles):
+        # Width, height, Ri and Ti of every picking area of every chromosome, calculated as in PickingArea, Ri and Ti
+        # are NaN if the aisles and cross-aisles are not in the precomputed travel distances
+        N = aisles.shape[1]
+        properties = np.full(aisles.shape + (4,), np.nan)
+        properties[:, :, 0] = self.w_i * aisles
+        properties[:, :, 1] = np.array(self.storage_capacities) / aisles + self.v_i * cross_aisles
+
+        if self.travel_distances is not None:
+            in_table = (aisles >= 1) & (aisles <= 30) & (cross_aisles >= 2) & (cross_aisles <= 10) & \
+                       (aisles == np.round(aisles)) & (cross_aisles == np.round(cross_aisles))
+            n_index = np.clip(aisles.astype(int) - 1, 0, 29)
+            k_index = np.clip(cross_aisles.astype(int) - 2, 0, 8)
+            properties[in_table, 2:] = self.travel_distances[np.arange(N), n_index, k_index][in_table]
+
+        # Return
+        return properties
+
+    def get_remaining_travel_distances(self, order, aisles, cross_aisles):
+        # Every picking area travels at least Ri + Ti of its aisles and cross-aisles, or the minimum Ri + Ti over all
+        # aisles and cross-aisles if those are outside the lookup table, as Ui and the penalty are never negative
+        # Fractional numbers of aisles or cross-aisles are not in the table and have no lower bound
+        lower_bounds = np.zeros(len(order) + 1)
+        if self.travel_distances is not None:
+            for position, index in enumerate(order):
+                n, k = float(aisles[index]), float(cross_aisles[index])
+                if not n.is_integer() or not k.is_integer():
+                    continue
+                elif 1 <= n <= 30 and 2 <= k <= 10:
+                    lower_bounds[position] = self.travel_distances[index, int(n) - 1, int(k) - 2].sum()
+                else:
+                    lower_bounds[position] = self.travel_distances[index].sum(axis=-1).min()
+
+        # Return lower bound of the travel distance of all picking areas from every position onward
+        return np.cumsum(lower_bounds[::-1])[::-1]
+
+    def place(self, order, aisles, cross_aisles, bound=math.inf, properties=None):
+        # Lower bound of the travel distance still to come after every position
+        if bound < math.inf:
+            remaining_travel_distances = self.get_remaining_travel_distances(order, aisles, cross_aisles)
+
+        for position, index in enumerate(order):
             # Get number from index
             number = index + 1
 
             # Get number of aisles, cross-aisles, storage capacity, order distribution and replenishment constant
-            n = aisles[index]
-            k = cross_aisles[index]
+            # Aisles and cross-aisles are converted to floats, such that rounding does not depend on their type
+            n = float(aisles[index])
+            k = float(cross_aisles[index])
             s_i = self.storage_capacities[index]
             m = self.order_sizes[index]
             alpha = self.replenishments[index]
             color = self.PA_colors[index]
+            travel_distances = self.travel_distances[index] if self.travel_distances is not None else None
 
-            # Create picking area
-            picking_area = PickingArea(s_i, n, k, m, s_i, alpha, self.w_i, self.v_i, number, color)
+            # Create picking area, with its size and travel distances of get_picking_area_properties if given
+            picking_area = PickingArea(s_i, n, k, m, s_i, alpha, self.w_i, self.v_i, number, color,
+                                       travel_distances=travel_distances,
+                                       properties=properties[index] if properties is not None else None)
 
             # Insert picking area
             self.insert_picking_area(picking_area)
 
+            # Save state after this placement position
+            self.placement_states.append((self.EMS_list, self.total_travel_distance, self.feasible,
+                                          len(self.EMS_history)))
+
             # If we choose to animate the placement, we set animate to True
             if self.animate:
                 # Draw animation frame
                 self.draw(True)
 
-        # If we choose to animate the placement, we set animate to True
-        if self.animate:
-            # Create animation
-            self.create_animation(fps=.5)
+            # Stop if the objective value will certainly exceed the bound, the objective value is rounded such that a
+            # chromosome that ties with the bound is not dominated
+            if bound < math.inf:
+                lower_bound = self.total_travel_distance + remaining_travel_distances[position + 1]
+                if round(lower_bound, 2) > bound:
+                    return False
 
-        # Return travel distance and feasibility
-        return round(self.total_travel_distance, 2), self.feasible
+        # Return that all picking areas were placed
+        return True
 
     def determine_ems(self, picking_area):
         best_EMS = EmptyMaximalSpace(0, 0, math.inf, math.inf, in_warehouse=False)
@@ -243,34 +418,8 @@ class Warehouse:
                 for new_EMS in new_EMSs:
                     new_EMS_list.append(new_EMS)
 
-        reduced_EMS_list = []
-        child_index = 0
         # Reduce list by eliminating fully contained EMSs
-        for EMS_child in new_EMS_list:
-            # Set variables
-            child_fits = False
-            parent_index = 0
-
-            # Check if it fits in any other EMS
-            for EMS_parent in new_EMS_list:
-                # Check if it fits
-                left_fits = EMS_parent.left_border <= EMS_child.left_border <= EMS_parent.right_border
-                right_fits = EMS_parent.left_border <= EMS_child.right_border <= EMS_parent.right_border
-                bottom_fits = EMS_parent.bottom_border <= EMS_child.bottom_border <= EMS_parent.top_border
-                top_fits = EMS_parent.bottom_border <= EMS_child.top_border <= EMS_parent.top_border
-
-                # Check if it fits
-                if not child_fits and child_index != parent_index:
-                    child_fits = left_fits and right_fits and bottom_fits and top_fits
-
-                # Increment index
-                parent_index = parent_index + 1
-
-            if not child_fits:
-                reduced_EMS_list.append(EMS_child)
-
-            # Increment index
-            child_index = child_index + 1
+        reduced_EMS_list = self.remove_contained_ems(new_EMS_list)
 
         # Set reduced list
         self.EMS_list = reduced_EMS_list
@@ -282,6 +431,54 @@ class Warehouse:
         # Return list
         return self.EMS_list
 
+    def remove_contained_ems(self, EMS_list):
+        # Sort by left border, right border descending, bottom border and top border descending
+        # An EMS that contains another EMS is sorted before it, equal EMSs are sorted next to each other
+        keys = [(EMS.left_border, -EMS.right_border, EMS.bottom_border, -EMS.top_border) for EMS in EMS_list]
+        order = sorted(range(len(EMS_list)), key=keys.__getitem__)
+
+        # Equal EMSs contain each other
+        contained = [False] * len(EMS_list)
+        for previous_index, index in zip(order, order[1:]):
+            if keys[previous_index] == keys[index]:
+                contained[previous_index] = contained[index] = True
+
+        # Every earlier EMS starts left of this EMS, it contains this EMS if it has a lower or equal bottom border and
+        # a higher or equal right and top border. Earlier EMSs are kept in a Fenwick tree over their bottom borders, of
+        # which every node holds the skyline of right and top borders that no other EMS of the node beats in both,
+        # such that checking and adding an EMS takes O(log^2 E) for E EMSs
+        bottoms = sorted(set(key[2] for key in keys))
+        rights = [[] for x in range(len(bottoms) + 1)]
+        negative_tops = [[] for x in range(len(bottoms) + 1)]
+        for child_index in order:
+            left, negative_right, bottom, negative_top = keys[child_index]
+            right, top = -negative_right, -negative_top
+            start = bisect_right(bottoms, bottom)
+
+            # Check if it fits in any earlier EMS with a lower or equal bottom border
+            node = start
+            while node > 0 and not contained[child_index]:
+                node_rights = rights[node]
+                index = bisect_left(node_rights, right)
+                contained[child_index] = index < len(node_rights) and negative_tops[node][index] <= negative_top
+                node = node & (node - 1)
+
+            # Add to the skyline of every node that covers its bottom border, unless an EMS of the node beats it
+            node = start
+            while node < len(rights):
+                node_rights, node_negative_tops = rights[node], negative_tops[node]
+                index = bisect_left(node_rights, right)
+                if index == len(node_rights) or node_negative_tops[index] > negative_top:
+                    # Replace the EMSs of the skyline that it beats in both
+                    first = bisect_left(node_negative_tops, negative_top, 0, index)
+                    last = index + 1 if index < len(node_rights) and node_rights[index] == right else index
+                    node_rights[first:last] = [right]
+                    node_negative_tops[first:last] = [negative_top]
+                node = node + (node & -node)
+
+        # Keep the order of the list
+        return [EMS for index, EMS in enumerate(EMS_list) if not contained[index]]
+
     def get_total_ems(self):
         # Calculate total surface space left
         surface_space = 0
@@ -309,6 +506,14 @@ class Warehouse:
         return dimensions
 
     def draw(self, save=False, filename=None):
+        # Draw without matplotlib
+        if self.renderer == "raster":
+            return self.draw_raster(save, filename)
+
+        # Import here, matplotlib is only loaded when drawing
+        from matplotlib import pyplot as plt
+        from matplotlib.patches import Rectangle
+
         # Create figure
         plt.figure()
         
@@ -363,20 +568,40 @@ class Warehouse:
             # Show plot
             plt.show()
         else:
-            # Create file name and append it to a list
-            if filename is None:
-                # Create frame
-                filename = f'animation/frames/{self.frame}.png'
-                self.frame_files.append(filename)
-        
-                # Increment frame
-                self.frame = self.frame + 1
-        
             # Save frame
-            plt.savefig(filename)
+            plt.savefig(self.get_frame_filename() if filename is None else filename)
             plt.close()
 
+    def draw_raster(self, save=False, filename=None):
+        # Import here, PIL is only loaded when drawing
+        from .raster_renderer import render_layout
+
+        # Draw layout with PIL
+        image = render_layout(self.W, self.H, self.PA_list)
+
+        # Save image
+        if save is False:
+            # Show image
+            image.show()
+        else:
+            # Save frame
+            image.save(self.get_frame_filename() if filename is None else filename)
+
+    def get_frame_filename(self):
+        # Create file name and append it to a list
+        filename = f'animation/frames/{self.frame}.png'
+        self.frame_files.append(filename)
+
+        # Increment frame
+        self.frame = self.frame + 1
+
+        # Return
+        return filename
+
     def create_animation(self, fps=2):
+        # Import here, imageio is only loaded when animating
+        import imageio
+
         # Build gif
         with imageio.get_writer('animation/finished/' + self.chromosome + '.gif', mode='I', fps=fps) as writer:
             for filename in self.frame_files:
@@ -1,2 +1,2 @@
 # __init__.py
-from .data_handling import lookup_travel_distance, read_instance, write_instance, create_instances, get_solutions, create_null_solutions, import_solutions, get_unsolved_instances
+from .data_handling import lookup_travel_distance, create_travel_distance_table, read_instance, write_instance, create_instances, get_solutions, create_null_solutions, import_solutions, get_unsolved_instances
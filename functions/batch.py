@@ -0,0 +1,153 @@
+from .data_handling import read_obj_value, get_instances, get_unsolved_instances, read_instance
+from datetime import datetime
+from multiprocessing import Pool
+import pathlib
+import csv
+import os
+import numpy as np
+
+# Directory path
+directory = str(pathlib.Path().resolve())
+
+# Solver settings, equal to __main__.py, solution images are drawn with the headless renderer. Parallel jobs would
+# overwrite each other's animation frames, so the final solution is not animated
+default_settings = dict(save_generations=False, population_size=100, fittest_size=.33, random_size=.33,
+                        children_size=.33, penalty=100000, initial_random_factor=5, iterations=100,
+                        log_to_console=False, renderer="raster", animate_solution=False)
+
+
+def parse_instances(text):
+    # Parse instances such as "1-10,15,20-25"
+    instances = []
+    for part in text.split(","):
+        if "-" in part:
+            first, last = part.split("-")
+            instances.extend(range(int(first), int(last) + 1))
+        elif part.strip() != "":
+            instances.append(int(part))
+
+    # Return sorted unique instances
+    return sorted(set(instances))
+
+
+def get_run_time(instance):
+    # Mean total time in milliseconds of earlier runs, None if the instance was never run
+    path = directory + "/data/diagnostics/instance" + str(instance) + "/diagnostics.csv"
+    try:
+        with open(path, newline='') as f:
+            total_times = [float(row["total_time"]) for row in csv.DictReader(f) if row.get("total_time")]
+    except (OSError, ValueError):
+        return None
+
+    # Return
+    return np.mean(total_times) if len(total_times) > 0 else None
+
+
+def schedule_instances(instances):
+    # Expected run times from earlier runs
+    run_times = {instance: get_run_time(instance) for instance in instances}
+
+    # Instances without earlier runs are expected to take the mean time of the others
+    known = [x for x in run_times.values() if x is not None]
+    default = np.mean(known) if len(known) > 0 else 0
+    run_times = {instance: default if run_time is None else run_time for instance, run_time in run_times.items()}
+
+    # Longest first, such that the workers finish at roughly the same time
+    return sorted(instances, key=lambda instance: -run_times[instance]), run_times
+
+
+def run_instance(job):
+    # Import here, such that the batch runner itself does not load the solvers
+    from classes import GeneticAlgorithm, BranchAndBound
+
+    # Unpack
+    instance, settings, exact_threshold, exact_run_time = job
+
+    # Instance
+    if not os.path.exists("./data/diagnostics/instance" + str(instance)):
+        os.makedirs("./data/diagnostics/instance" + str(instance))
+
+    # Run instance
+    start_time = datetime.now()
+    status = "solved"
+    try:
+        # Search instances with few picking areas exhaustively, the genetic algorithm runs if no optimal solution is
+        # found in time
+        exact_solution = None
+        if read_instance(instance)[2] <= exact_threshold:
+            solver = BranchAndBound(penalty=settings.get("penalty", 100000), max_run_time=exact_run_time,
+                                    log_to_console=settings.get("log_to_console", True))
+            exact_solution = solver.run(instance)
+            if exact_solution is not None and solver.optimal:
+                status = "optimal"
+
+        if status != "optimal":
+            algorithm = GeneticAlgorithm(**settings)
+            algorithm.run(instance)
+
+            # The genetic algorithm overwrites the solution, keep the best solution of the search if it is fitter
+            obj_value = read_obj_value(instance)
+            if exact_solution is not None and (obj_value < 0 or exact_solution[1] < obj_value):
+                solver.write_solution(exact_solution[0])
+    except Exception as e:
+        status = "error: " + str(e)
+
+    # Read the written solution
+    try:
+        obj_value = read_obj_value(instance)
+    except (OSError, ValueError, StopIteration):
+        obj_value = -1
+
+    # No feasible solution was written
+    if status == "solved" and obj_value < 0:
+        status = "unsolved"
+
+    # Return summary
+    return {"instance": instance, "status": status, "objective_value": obj_value,
+            "time": round((datetime.now() - start_time).total_seconds(), 2)}
+
+
+def run_batch(instances=None, unsolved=False, workers=1, settings=None, summary="data/batch_summary.csv",
+              exact_threshold=0, exact_run_time=30):
+    # Instances to run
+    if instances is None:
+        instances = get_unsolved_instances() if unsolved else get_instances()
+    elif unsolved:
+        instances = sorted(set(instances) & set(get_unsolved_instances()))
+
+    # Solver settings
+    if settings is None:
+        settings = default_settings
+
+    # Order instances longest first
+    instances, run_times = schedule_instances(instances)
+    print("Running", len(instances), "instances on", workers, "workers")
+
+    # Every instance runs in a fresh worker process
+    results = []
+    with Pool(workers, maxtasksperchild=1) as pool:
+        jobs = [(instance, settings, exact_threshold, exact_run_time) for instance in instances]
+        for result in pool.imap_unordered(run_instance, jobs):
+            # Expected time in seconds
+            result["expected_time"] = round(run_times[result["instance"]] / 1000, 2)
+            results.append(result)
+
+            # Log
+            print("Instance", result["instance"], result["status"], "with objective value",
+                  result["objective_value"], "in", result["time"], "s (" + str(len(results)) + "/" + str(len(instances)) + ")")
+
+    # Write summary
+    results = sorted(results, key=lambda x: x["instance"])
+    with open(summary, "w", newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=["instance", "status", "objective_value", "time", "expected_time"])
+        writer.writeheader()
+        writer.writerows(results)
+
+    # Report
+    print("Solved", len([x for x in results if x["status"] in ["solved", "optimal"]]), "of", len(results), "instances,",
+          len([x for x in results if x["status"] == "optimal"]), "proven optimal")
+    print("Total time:", round(sum(x["time"] for x in results), 2), "s")
+    print("Written summary to", summary)
+
+    # Return
+    return results
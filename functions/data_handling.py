@@ -1,44 +1,89 @@
-import pandas as pd
 import pathlib
 import csv
 import numpy as np
 import os
 import math
+import hashlib
 from random import randrange, random
 
 # Directory path
 directory = str(pathlib.Path().resolve())
 
-# Try loading the processed CSV file, otherwise use the standard lookup XLSX
-try:
-    df_g = pd.read_csv(directory + "/data/processed_lookup_g.csv", index_col=[0, 1, 2])
-    df_h = pd.read_csv(directory + "/data/processed_lookup_h.csv", index_col=[0, 1, 2])
-    df_f = pd.read_csv(directory + "/data/processed_lookup_f.csv", index_col=[0, 1, 2])
-except Exception as e:
-    print(str(e))
-    for sheet in ["g","h","f"]:
+# Lookup sheets and the compiled cache of the processed lookup files
+lookup_sheets = ["g", "h", "f"]
+lookup_cache = directory + "/data/processed_lookup.npz"
+
+
+def get_checksum(paths):
+    # Checksum over the contents of all files
+    checksum = hashlib.sha1()
+    for path in paths:
+        with open(path, "rb") as f:
+            checksum.update(f.read())
+
+    # Return
+    return checksum.hexdigest()
+
+
+def create_processed_lookups():
+    # Pandas is only required to read the standard lookup XLSX
+    import pandas as pd
+
+    for sheet in lookup_sheets:
         print(sheet)
         # Import Excel file
         data = pd.read_excel(directory + "/data/lookup.xlsx", sheet, header=1, index_col=[0, 1])
 
-        # Create lookup table
-        df = pd.DataFrame(columns=["n", "k", "m", "distance"])
-        for index, row in data.iterrows():
-            # Convert to lookup table
-            m = 1
-            for distance in row:
-                df = df.append({"n":int(index[0]), "k": int(index[1]), "m": int(m), "distance": distance}, ignore_index=True)
-                m = m + 1
+        # Write lookup table with one row for every n, k and m
+        with open(directory + "/data/processed_lookup_" + sheet + ".csv", "w") as f:
+            f.write("n,k,m,distance\n")
+            for (n, k), row in zip(data.index, data.to_numpy()):
+                for m, distance in enumerate(row, start=1):
+                    f.write(",".join([str(int(n)), str(int(k)), str(m), str(distance)]) + "\n")
 
-        # Set index
-        df = df.set_index(["n", "k", "m"])
 
-        # Save to csv
-        df.to_csv(directory + "/data/processed_lookup_" + sheet + ".csv")
+def read_processed_lookup(path):
+    # Read n, k, m and distance columns
+    data = np.loadtxt(path, delimiter=",", skiprows=1)
 
-    df_g = pd.read_csv(directory + "/data/processed_lookup_g.csv", index_col=[0, 1, 2])
-    df_h = pd.read_csv(directory + "/data/processed_lookup_h.csv", index_col=[0, 1, 2])
-    df_f = pd.read_csv(directory + "/data/processed_lookup_f.csv", index_col=[0, 1, 2])
+    # Sort by n, k and m, such that the distances form a dense (30, 9, 30) tensor
+    data = data[np.lexsort((data[:, 2], data[:, 1], data[:, 0]))]
+
+    # Return
+    return data[:, 3].reshape(30, 9, 30)
+
+
+def load_lookup_tables():
+    # Try loading the processed CSV files, otherwise create them from the standard lookup XLSX
+    paths = [directory + "/data/processed_lookup_" + sheet + ".csv" for sheet in lookup_sheets]
+    if not all(os.path.exists(path) for path in paths):
+        create_processed_lookups()
+
+    # Use the compiled cache if it was created from the same processed lookup files
+    checksum = get_checksum(paths)
+    if os.path.exists(lookup_cache):
+        try:
+            with np.load(lookup_cache) as cache:
+                if str(cache["checksum"]) == checksum:
+                    return cache["g"], cache["h"], cache["f"]
+        except Exception as e:
+            print(str(e))
+
+    # Read processed lookup files
+    tables = [read_processed_lookup(path) for path in paths]
+
+    # Save compiled cache, written to a temporary file first since several processes might start at once
+    tmp_path = lookup_cache + "." + str(os.getpid()) + ".tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez(f, checksum=checksum, **dict(zip(lookup_sheets, tables)))
+    os.replace(tmp_path, lookup_cache)
+
+    # Return
+    return tables
+
+
+# Dense lookup tensors indexed by (n - 1, k - 2, m - 1), n in 1..30, k in 2..10 and m in 1..30
+lookup_g, lookup_h, lookup_f = load_lookup_tables()
 
 
 def lookup_travel_distance(n, k, m, S=1, w=.2, v=.1):
@@ -46,33 +91,47 @@ def lookup_travel_distance(n, k, m, S=1, w=.2, v=.1):
     if n < 1 or n > 30 or k < 2 or k > 10:
         return math.inf
 
+    # Tensor indexes
+    n_index = int(n) - 1
+    k_index = int(k) - 2
+
     if isinstance(m, list):
         # Calculate average travel distance based on distribution of order sizes
-        order_sizes = np.arange(1, len(m) + 1)
         m = np.array(m)
-
+        g = lookup_g[n_index, k_index, :len(m)]
+        h = lookup_h[n_index, k_index, :len(m)]
+        f = lookup_f[n_index, k_index, :len(m)]
 
         # Calculate expected travel distance
-        expected_travel_distance = 0
-        i = 0
-        for size in order_sizes:
-            g = df_g.loc[(n, k, size)]["distance"]
-            h = df_h.loc[(n, k, size)]["distance"]
-            f = df_f.loc[(n, k, size)]["distance"]
-            T_im = S * (g / n) + w * h + v * f
-            expected_travel_distance = expected_travel_distance + m[i] * T_im
-            i = i + 1
+        T_im = S * (g / n) + w * h + v * f
+        expected_travel_distance = np.dot(m, T_im)
 
         # Return expected travel distance
         return round(expected_travel_distance, 2)
     else:
-        g = df_g.loc[(n, k, m)]["distance"]
-        h = df_h.loc[(n, k, m)]["distance"]
-        f = df_f.loc[(n, k, m)]["distance"]
+        g = lookup_g[n_index, k_index, int(m) - 1]
+        h = lookup_h[n_index, k_index, int(m) - 1]
+        f = lookup_f[n_index, k_index, int(m) - 1]
         T_i1 = S * (g / n) + w * h + v * f
         return round(T_i1, 2)
 
 
+def create_travel_distance_table(S, u, alpha, w_i, v_i):
+    # Ri and Ti for every picking area, number of aisles n in 1..30 and number of cross-aisles k in 2..10, kept apart
+    # such that Ui + Ri + Ti is summed in the same order as without the table
+    table = np.zeros((len(S), 30, 9, 2))
+    for i in range(len(S)):
+        for n in range(1, 31):
+            for k in range(2, 11):
+                # Same rounding as PickingArea.calculate_travel_distance
+                Ri = round(round(alpha[i], 2) * round(lookup_travel_distance(n, k, 1, S=S[i], w=w_i, v=v_i), 2), 2)
+                Ti = round(lookup_travel_distance(n, k, u[i], S=S[i], w=w_i, v=v_i), 2)
+                table[i, n - 1, k - 2] = Ri, Ti
+
+    # Return table
+    return table
+
+
 def create_instances(number, max_N=20):
     for index in range(number):
         # Number of picking areas
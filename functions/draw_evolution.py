@@ -1,13 +1,17 @@
 from classes import Warehouse
+from classes.generation_log import read_generation_log
+from classes.raster_renderer import render_layout, get_font
 from .data_handling import read_instance
-import pandas as pd
-from PIL import Image, ImageDraw, ImageFont
-import imageio
+from PIL import Image, ImageDraw, GifImagePlugin
+import multiprocessing
 import os
 from tqdm import tqdm
 from pathlib import Path
 import numpy as np
 
+# Warehouse of the instance that is drawn, one per worker process
+warehouse = None
+
 
 # Definitions
 def create_image(im1, im2, im3=None, generation=0, child_no=1, mutation="", data={}):
@@ -20,7 +24,7 @@ def create_image(im1, im2, im3=None, generation=0, child_no=1, mutation="", data
     draw = ImageDraw.Draw(dst)
 
     # Get font
-    font = ImageFont.truetype("data/arial.ttf", 30)
+    font = get_font(30)
 
     # Generation number
     draw.text((width/2 + 5, int(im2.height)*2 - 50), "Generation " + str(generation), (255, 255, 255), font=font)
@@ -57,7 +61,95 @@ def create_image(im1, im2, im3=None, generation=0, child_no=1, mutation="", data
     return dst
 
 
-def draw_evolution(instances=None, remove_files=True):
+def init_worker(instance, colors):
+    # Instantiate the warehouse of the instance, with the same picking area colors in every worker
+    global warehouse
+    W, H, N, w_i, v_i, S, alpha, u, mean_u = read_instance(instance)
+    warehouse = Warehouse(W, H, S, u, alpha, animate=False, w_i=w_i, v_i=v_i)
+    warehouse.PA_colors = colors
+
+
+def describe_mutation(child, mutation):
+    # Dissect mutation
+    description = "Mutations:"
+    N = round(len(mutation)/3)
+
+    # Order
+    child_order = np.argsort(child[:N])
+    original_child_order = np.argsort(np.array(child[:N]) + np.array(mutation[:N]))
+    if "".join(str(x) for x in child_order) != "".join(str(x) for x in original_child_order):
+        description = description + "\r\nOrder changed from " + ">".join(str(x) for x in original_child_order) + " to " + ">".join(str(x) for x in child_order)
+
+    # Aisles and cross-aisles
+    aisles = np.array(mutation[N:2*N]).round(0)
+    cross_aisles = np.array(mutation[2*N:3*N]).round(0)
+    for i in range(N):
+        if int(cross_aisles[i]) > 0 or int(cross_aisles[i]) < 0 or int(aisles[i]) > 0 or int(aisles[i]) < 0:
+            description = description + "\r\nPA " + str(i)
+            if int(aisles[i]) < 0:
+                description = description + ", removed " + str(-1*int(aisles[i])) + " aisle(s)"
+            elif int(aisles[i]) > 0:
+                description = description + ", added " + str(int(aisles[i])) + " aisle(s)"
+
+            if int(cross_aisles[i]) < 0:
+                description = description + ", removed " + str(-1 * int(cross_aisles[i])) + " cross-aisle(s)"
+            elif int(cross_aisles[i]) > 0:
+                description = description + ", added " + str(int(cross_aisles[i])) + " cross-aisle(s)"
+
+    # Return
+    return description
+
+
+def render_frame(row):
+    # Only draw father if there are two parents
+    single_parent = np.array_equal(row["mother"], row["father"])
+    if single_parent:
+        types_to_draw = ["mother", "child"]
+    else:
+        types_to_draw = ["mother", "father", "child"]
+
+    # Describe mutation
+    description = describe_mutation(row["child"].tolist(), row["mutation"].tolist())
+
+    # Draw in memory
+    processed = {"mother": (0, True), "father": (0, True), "child": (0, True)}
+    images = {}
+    for type_to_draw in types_to_draw:
+        processed[type_to_draw] = warehouse.process(row[type_to_draw].tolist())
+        images[type_to_draw] = render_layout(warehouse.W, warehouse.H, warehouse.PA_list)
+
+    # Concatenate images
+    if single_parent:
+        frame = create_image(images["mother"], images["child"], generation=row["generation"],
+                             child_no=row["child_no"], mutation=description, data=processed)
+    else:
+        frame = create_image(images["mother"], images["father"], images["child"], generation=row["generation"],
+                             child_no=row["child_no"], mutation=description, data=processed)
+
+    # Return frame with a palette, such that the gif only has to encode it
+    return frame.quantize(256, method=Image.Quantize.FASTOCTREE)
+
+
+def write_gif(path, frames, duration=100, loop=0):
+    # Write frames with a palette to a gif one at a time, such that only the current frame is held in memory
+    with open(path, "wb") as f:
+        for index, frame in enumerate(frames):
+            # Header with the palette of the first frame
+            if index == 0:
+                header, used_palette_colors = GifImagePlugin.getheader(frame, info={"loop": loop, "duration": duration})
+                f.write(b"".join(header))
+
+            # Every frame has its own palette
+            f.write(b"".join(GifImagePlugin.getdata(frame, duration=duration, include_color_table=True)))
+
+        # Trailer
+        f.write(b";")
+
+
+def draw_evolution(instances=None, workers=None):
+    # Render frames in a worker process per CPU by default
+    workers = os.cpu_count() if workers is None else workers
+
     if instances is None:
         # Get all instances
         instances = []
@@ -77,132 +169,41 @@ def draw_evolution(instances=None, remove_files=True):
     for instance in instances:
         print("\r\nProcessing instance", str(instance), "of", str(len(instances)))
         # Get generation data
-        df = pd.read_csv("data/generations/inst" + str(instance) + ".csv")
+        log = read_generation_log("data/generations/inst" + str(instance) + ".csv")
+        rows = len(log["generation"])
 
-        # Read variables from instance
+        # Picking area colors of the instance
         W, H, N, w_i, v_i, S, alpha, u, mean_u = read_instance(instance)
-
-        # Instantiate warehouse
-        warehouse = Warehouse(W, H, S, u, alpha, animate=False, w_i=w_i, v_i=v_i)
+        colors = Warehouse(W, H, S, u, alpha, animate=False, w_i=w_i, v_i=v_i).PA_colors
 
         # Failsafe
-        if len(df.index) == 0:
+        if rows == 0:
             print("\r\nInstance has no generations\r\n")
         else:
-            # Iterate each rows
+            # Rows with chromosomes as arrays, generated as frames are rendered
+            def get_rows():
+                for index in range(rows):
+                    row = {name: values[index] for name, values in log.items()}
+                    row["generation"], row["child_no"] = int(row["generation"]), int(row["child_no"])
+                    yield row
+
+            # Render frames in order, in worker processes or in this process
+            pool = None
+            if workers > 1:
+                pool = multiprocessing.Pool(workers, initializer=init_worker, initargs=(instance, colors))
+                frames = pool.imap(render_frame, get_rows(), chunksize=16)
+            else:
+                init_worker(instance, colors)
+                frames = map(render_frame, get_rows())
+
+            # Stream frames into the gif at 10 frames per second
             print("\r\nProcessing all generations\r\n")
-            for index in tqdm(range(len(df.index))):
-                # Get row
-                row = df.iloc[index]
-
-                # Only draw father if there are two parents
-                if row["mother"] == row["father"]:
-                    types_to_draw = ["mother", "child"]
-                else:
-                    types_to_draw = ["mother", "father", "child"]
-
-                # Dissect mutation
-                description = "Mutations:"
-                child = [float(x) if "." in str(x) else int(x) for x in row["child"].split("|")]
-                mutation = [float(x) if "." in str(x) else int(x) for x in row["mutation"].split("|")]
-                N = round(len(mutation)/3)
-
-                # Order
-                child_order = np.argsort(child[:N])
-                original_child_order = np.argsort(np.array(child[:N]) + np.array(mutation[:N]))
-                if "".join(str(x) for x in child_order) != "".join(str(x) for x in original_child_order):
-                    description = description + "\r\nOrder changed from " + ">".join(str(x) for x in original_child_order) + " to " + ">".join(str(x) for x in child_order)
-
-                # Aisles and cross-aisles
-                aisles = np.array(mutation[N:2*N]).round(0)
-                cross_aisles = np.array(mutation[2*N:3*N]).round(0)
-                for i in range(N):
-                    if int(cross_aisles[i]) > 0 or int(cross_aisles[i]) < 0 or int(aisles[i]) > 0 or int(aisles[i]) < 0:
-                        description = description + "\r\nPA " + str(i)
-                        if int(aisles[i]) < 0:
-                            description = description + ", removed " + str(-1*int(aisles[i])) + " aisle(s)"
-                        elif int(aisles[i]) > 0:
-                            description = description + ", added " + str(int(aisles[i])) + " aisle(s)"
-
-                        if int(cross_aisles[i]) < 0:
-                            description = description + ", removed " + str(-1 * int(cross_aisles[i])) + " cross-aisle(s)"
-                        elif int(cross_aisles[i]) > 0:
-                            description = description + ", added " + str(int(cross_aisles[i])) + " cross-aisle(s)"
-
-                # Draw
-                processed = {"mother": (0, True), "father": (0, True), "child": (0, True)}
-                for type_to_draw in types_to_draw:
-                    # Get chromosome
-                    chromosome = [float(x) if "." in str(x) else int(x) for x in row[type_to_draw].split("|")]
-
-                    # Create image
-                    processed[type_to_draw] = warehouse.process(chromosome)
-                    warehouse.draw(save=True,
-                                   filename=f'animation/frames/{type_to_draw}-{row["child_no"]}-{row["generation"]}.png')
-
-                # Frame filename
-                filename = 'animation/frames/concatenated/' + str(index) + ".png"
-
-                # Concatenate images
-                if row["mother"] == row["father"]:
-                    mother_image = Image.open(f'animation/frames/mother-{row["child_no"]}-{row["generation"]}.png')
-                    child_image = Image.open(f'animation/frames/child-{row["child_no"]}-{row["generation"]}.png')
-
-                    # Create combined image
-                    create_image(mother_image, child_image, generation=row["generation"], child_no=row["child_no"],
-                                 mutation=description, data=processed).save(
-                        filename)
-
-                    # Remove
-                    if remove_files:
-                        os.remove(f'animation/frames/mother-{row["child_no"]}-{row["generation"]}.png')
-                        os.remove(f'animation/frames/child-{row["child_no"]}-{row["generation"]}.png')
-                else:
-                    mother_image = Image.open(f'animation/frames/mother-{row["child_no"]}-{row["generation"]}.png')
-                    father_image = Image.open(f'animation/frames/father-{row["child_no"]}-{row["generation"]}.png')
-                    child_image = Image.open(f'animation/frames/child-{row["child_no"]}-{row["generation"]}.png')
-
-                    # Create combined image
-                    create_image(mother_image, father_image, child_image, generation=row["generation"],
-                                 child_no=row["child_no"], mutation=description, data=processed).save(filename)
-
-                    # Remove
-                    if remove_files:
-                        os.remove(f'animation/frames/mother-{row["child_no"]}-{row["generation"]}.png')
-                        os.remove(f'animation/frames/father-{row["child_no"]}-{row["generation"]}.png')
-                        os.remove(f'animation/frames/child-{row["child_no"]}-{row["generation"]}.png')
-
-            print("\r\nAll generations have been processed\r\n")
-
-            # Get all files
-            filenames = []
-            pathlist = Path("animation/frames/concatenated").glob("*.png")
-            for path in pathlist:
-                # Convert to string
-                path_in_str = str(path.resolve())
-
-                # Get instance
-                filenames.append(path_in_str)
-
-            # Sort filenames
-            filenames = sorted(filenames, key=lambda x: int(x.split("/").pop().split(".").pop(0)))
-
-            # Build gif
-            with imageio.get_writer("animation/finished/inst" + str(instance) + ".gif", mode='I', fps=10) as writer:
-                print("\r\nCreating GIF\r\n")
-                for index in tqdm(range(len(filenames))):
-                    # Get filename
-                    filename = filenames[index]
-
-                    # Get image
-                    image = imageio.imread(filename)
-
-                    # Write image
-                    writer.append_data(image)
-
-                    # Remove
-                    if remove_files:
-                        os.remove(filename)
-
-                # Report
-                print("\r\nCreated GIF")
+            write_gif("animation/finished/inst" + str(instance) + ".gif", tqdm(frames, total=rows), duration=100)
+
+            # Report
+            print("\r\nCreated GIF")
+
+            # Stop worker processes
+            if pool is not None:
+                pool.close()
+                pool.join()
@@ -4,7 +4,7 @@ from random import sample
 from datetime import datetime
 
 
-def generate_feasible_solutions(algorithm=None, max_solutions=math.inf, max_run_time=math.inf, log_to_console=True, iteration=0):
+def generate_feasible_solutions(algorithm=None, max_solutions=math.inf, max_run_time=math.inf, log_to_console=True, iteration=0, batch_size=100):
     # Read variables
     W, H, N, w_i, v_i, S = algorithm.warehouse.W, algorithm.warehouse.H, algorithm.N, algorithm.warehouse.w_i, algorithm.warehouse.v_i, algorithm.warehouse.storage_capacities
 
@@ -44,31 +44,28 @@ def generate_feasible_solutions(algorithm=None, max_solutions=math.inf, max_run_
         for i in range(10000):
             chromosomes.append([*np.random.sample(N).round(2), *[sample(list(aisle_options), 1)[0] for x in range(N)], *[2 for x in range(N)]])
 
-        # Get warehouse
-        warehouse = algorithm.warehouse
-
         if log_to_console:
             print("Processing", len(chromosomes), "possible chromosomes")
 
         print("Generating feasible solutions")
-        for i in range(len(chromosomes)):
-            # Get chromosome
-            chromosome = chromosomes[i]
-
-            # Process chromosome
-            obj_value, feasibility = warehouse.process(chromosome)
-
-            # Draw
-            if warehouse.feasible:
-                print("Found a feasible chromosome\r\n", chromosome, "\r\nwith objective value", obj_value)
-                feasible_solutions.append((chromosome, obj_value, feasibility))
-
-                # Stop if we have reached acquired amount of solutions
-                if len(feasible_solutions) > max_solutions:
-                    if log_to_console:
-                        print("Generating solutions aborted since we found enough feasible solutions")
-                        print("Found " + str(len(feasible_solutions)) + " feasible solutions")
-                    return feasible_solutions
+        for start in range(0, len(chromosomes), batch_size):
+            # Process a batch of chromosomes
+            batch = chromosomes[start:start + batch_size]
+            # Only feasible chromosomes are kept, so certainly infeasible ones need not be placed
+            obj_values, feasibilities = algorithm.evaluate(batch, precheck=True)
+
+            for chromosome, obj_value, feasibility in zip(batch, obj_values, feasibilities):
+                # Draw
+                if feasibility:
+                    print("Found a feasible chromosome\r\n", chromosome, "\r\nwith objective value", obj_value)
+                    feasible_solutions.append((chromosome, obj_value, feasibility))
+
+                    # Stop if we have reached acquired amount of solutions
+                    if len(feasible_solutions) > max_solutions:
+                        if log_to_console:
+                            print("Generating solutions aborted since we found enough feasible solutions")
+                            print("Found " + str(len(feasible_solutions)) + " feasible solutions")
+                        return feasible_solutions
 
             # Stop if we reached the maximum run time
             run_time = datetime.now() - start_run_time
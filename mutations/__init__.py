@@ -4,6 +4,7 @@ import os
 
 # Get all modules
 mutations = {}
+batch_mutations = {}
 directory = str(Path().resolve())
 pathlist = Path(directory + "/mutations").glob("*.py")
 
@@ -16,7 +17,8 @@ for path in pathlist:
     module = os.path.basename(path_in_str).split(".py").pop(0)
     function_name = module.split("_").pop()
 
-    # Import function
+    # Import function, and its batched version that mutates the rows of a chromosome matrix selected by a mask
     if len(function_name) == 3:
         mutations[function_name] = getattr(import_module("." + module, package='mutations'), "mutate_" + function_name)
-
+        batch_mutations[function_name] = getattr(import_module("." + module, package='mutations'),
+                                                 "mutate_" + function_name + "_batch")
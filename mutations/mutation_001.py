@@ -1,12 +1,19 @@
-from random import random, randrange
+import numpy as np
+
+
+def mutate_001_batch(self, chromosomes, mask):
+    rows = np.flatnonzero(mask)
+    index = np.random.randint(0, self.N - 1, size=len(rows))
+    change = np.where(np.random.random_sample(len(rows)) < .75, 1, -1)  # Higher chance of increasing aisles
+    aisles = chromosomes[rows, self.N + index] + change
+    aisles = np.where(aisles <= self.n_max, aisles, self.n_max)
+    aisles = np.where(aisles >= self.n_min[index], aisles, self.n_min[index])
+    chromosomes[rows, self.N + index] = aisles
+
+    return chromosomes
 
 
 def mutate_001(self, chromosome):
-    index = randrange(self.N - 1)
-    change = 1 if random() < .75 else -1  # Higher chance of increasing aisles
-    chromosome[self.N + index] = chromosome[self.N + index] + change
-    chromosome[self.N + index] = chromosome[self.N + index] if chromosome[self.N + index] <= self.n_max else self.n_max
-    chromosome[self.N + index] = chromosome[self.N + index] if chromosome[self.N + index] >= self.n_min[
-        index] else self.n_min[index]
+    chromosome[:] = mutate_001_batch(self, np.array([chromosome], dtype=float), np.ones(1, dtype=bool))[0]
 
     return chromosome
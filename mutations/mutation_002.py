@@ -1,13 +1,19 @@
-from random import randrange, random
+import numpy as np
+
+
+def mutate_002_batch(self, chromosomes, mask):
+    rows = np.flatnonzero(mask)
+    index = np.random.randint(0, self.N - 1, size=len(rows))
+    change = np.where(np.random.random_sample(len(rows)) < .25, 1, -1)  # Higher chance of reducing cross-aisles
+    cross_aisles = chromosomes[rows, 2 * self.N + index] + change
+    cross_aisles = np.where(cross_aisles <= 10, cross_aisles, 10)
+    cross_aisles = np.where(cross_aisles >= 2, cross_aisles, 2)
+    chromosomes[rows, 2 * self.N + index] = cross_aisles
+
+    return chromosomes
 
 
 def mutate_002(self, chromosome):
-    index = randrange(self.N - 1)
-    change = 1 if random() < .25 else -1  # Higher chance of reducing cross-aisles
-    chromosome[2 * self.N + index] = chromosome[2 * self.N + index] + change
-    chromosome[2 * self.N + index] = chromosome[2 * self.N + index] if chromosome[
-                                                                           2 * self.N + index] <= 10 else 10
-    chromosome[2 * self.N + index] = chromosome[2 * self.N + index] if chromosome[
-                                                                           2 * self.N + index] >= 2 else 2
-
-    return chromosome
\ No newline at end of file
+    chromosome[:] = mutate_002_batch(self, np.array([chromosome], dtype=float), np.ones(1, dtype=bool))[0]
+
+    return chromosome
@@ -1,9 +1,15 @@
 import numpy as np
 
 
-def mutate_003(self, chromosome):
+def mutate_003_batch(self, chromosomes, mask):
     # Randomize order
-    order = np.random.random_sample(self.N).round(2)
-    chromosome[:self.N] = order
+    orders = np.random.random_sample((np.count_nonzero(mask), self.N)).round(2)
+    chromosomes[mask, :self.N] = orders
+
+    return chromosomes
+
+
+def mutate_003(self, chromosome):
+    chromosome[:] = mutate_003_batch(self, np.array([chromosome], dtype=float), np.ones(1, dtype=bool))[0]
 
     return chromosome
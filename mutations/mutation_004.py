@@ -1,12 +1,16 @@
 import numpy as np
 
 
-def mutate_004(self, chromosome):
-    aisles = chromosome[self.N:2 * self.N]
-    aisles_mutation = np.random.randint(-1, 5, size=self.N)
-    aisles = np.array(aisles)
+def mutate_004_batch(self, chromosomes, mask):
+    aisles = chromosomes[mask, self.N:2 * self.N]
+    aisles_mutation = np.random.randint(-1, 5, size=aisles.shape)
     aisles = aisles + aisles_mutation
-    aisles[aisles < self.n_min] = self.n_min[aisles < self.n_min]
+    aisles = np.where(aisles < self.n_min, self.n_min, aisles)
     aisles[aisles > self.n_max] = self.n_max
-    chromosome[self.N:2 * self.N] = aisles
+    chromosomes[mask, self.N:2 * self.N] = aisles
+    return chromosomes
+
+
+def mutate_004(self, chromosome):
+    chromosome[:] = mutate_004_batch(self, np.array([chromosome], dtype=float), np.ones(1, dtype=bool))[0]
     return chromosome
@@ -1,11 +1,16 @@
 import numpy as np
 
 
-def mutate_005(self, chromosome):
-    cross_aisles = chromosome[2 * self.N:3 * self.N]
-    cross_aisles_mutation = np.random.randint(-1, 2, size=self.N)
-    cross_aisles = np.array(cross_aisles)
+def mutate_005_batch(self, chromosomes, mask):
+    cross_aisles = chromosomes[mask, 2 * self.N:3 * self.N]
+    cross_aisles_mutation = np.random.randint(-1, 2, size=cross_aisles.shape)
     cross_aisles = cross_aisles + cross_aisles_mutation
-    chromosome[2 * self.N:3 * self.N] = cross_aisles
+    chromosomes[mask, 2 * self.N:3 * self.N] = cross_aisles
+
+    return chromosomes
+
+
+def mutate_005(self, chromosome):
+    chromosome[:] = mutate_005_batch(self, np.array([chromosome], dtype=float), np.ones(1, dtype=bool))[0]
 
     return chromosome
@@ -1,10 +1,19 @@
+import numpy as np
 
-def mutate_006(self, chromosome):
+
+def mutate_006_batch(self, chromosomes, mask):
     # Check feasibility
-    obj_value, feasibility = self.warehouse.process(chromosome)
+    rows = np.flatnonzero(mask)
+    obj_values, feasibilities = self.evaluate(chromosomes[rows].tolist())
 
     # If not feasible
-    if feasibility is False:
-        chromosome[2 * self.N:3 * self.N] = [2 for x in range(self.N)]
+    infeasible = rows[np.logical_not(feasibilities)]
+    chromosomes[infeasible, 2 * self.N:3 * self.N] = 2
+
+    return chromosomes
+
+
+def mutate_006(self, chromosome):
+    chromosome[:] = mutate_006_batch(self, np.array([chromosome], dtype=float), np.ones(1, dtype=bool))[0]
 
     return chromosome
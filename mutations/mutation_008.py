@@ -1,9 +1,8 @@
 import numpy as np
-from random import choice
 
 
 # Calculates options for the aisles that might be optimal, such that it divides the warehouse in an integer number of width
-def mutate_008(self, chromosome):
+def mutate_008_batch(self, chromosomes, mask):
     # Aisle options
     max_n = self.warehouse.n_max
     divisible_by = []
@@ -14,6 +13,12 @@ def mutate_008(self, chromosome):
 
     # Choose one of the preferred aisle options
     if len(aisle_options) > 0:
-        chromosome[1 * self.N:2 * self.N] = [choice(aisle_options) for x in range(self.N)]
+        chromosomes[mask, 1 * self.N:2 * self.N] = np.random.choice(aisle_options, (np.count_nonzero(mask), self.N))
+
+    return chromosomes
+
+
+def mutate_008(self, chromosome):
+    chromosome[:] = mutate_008_batch(self, np.array([chromosome], dtype=float), np.ones(1, dtype=bool))[0]
 
     return chromosome
@@ -0,0 +1,59 @@
+# Properties of the elimination of contained EMSs in Warehouse.update_ems_list, the sweep must keep the same EMSs in the
+# same order as the original pairwise check
+# Run from the repository root: python -m pytest tests
+from benchmarks.pruning import remove_contained_ems_pairwise, random_ems_list
+from classes import GeneticAlgorithm, Warehouse
+from functions import read_instance
+import numpy as np
+import pytest
+
+
+def get_first_instances():
+    # First instance of every number of picking areas
+    instances = {}
+    for instance in range(1, 451):
+        instances.setdefault(read_instance(instance)[2], instance)
+
+    return sorted(instances.values())
+
+
+def get_placement_ems_lists(warehouse, chromosomes):
+    # Record the EMS list of every elimination during placement
+    EMS_lists = []
+    remove_contained_ems = warehouse.remove_contained_ems
+
+    def record(EMS_list):
+        EMS_lists.append(EMS_list)
+        return remove_contained_ems(EMS_list)
+
+    warehouse.remove_contained_ems = record
+    warehouse.process_many(chromosomes)
+    del warehouse.remove_contained_ems
+
+    # Return
+    return EMS_lists
+
+
+def test_random_ems_lists():
+    warehouse = Warehouse(100, 100, [], [], 1)
+
+    # Coarse grids give many equal EMSs and EMSs touching on borders
+    np.random.seed(0)
+    for test in range(2000):
+        EMS_list = random_ems_list(np.random.randint(0, 40), np.random.choice([4, 8, 32]))
+        assert warehouse.remove_contained_ems(EMS_list) == remove_contained_ems_pairwise(EMS_list)
+
+
+@pytest.mark.parametrize("instance", get_first_instances())
+def test_placement_ems_lists(instance):
+    warehouse = Warehouse(100, 100, [], [], 1)
+
+    # EMS lists of every elimination during placement of random chromosomes
+    np.random.seed(0)
+    algorithm = GeneticAlgorithm(log_to_console=False)
+    algorithm.instantiate(instance)
+    EMS_lists = get_placement_ems_lists(algorithm.warehouse, algorithm.create_random_chromosomes(50))
+
+    assert len(EMS_lists) > 0
+    for EMS_list in EMS_lists:
+        assert warehouse.remove_contained_ems(EMS_list) == remove_contained_ems_pairwise(EMS_list)